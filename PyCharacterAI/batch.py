@@ -0,0 +1,120 @@
+import math
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .types import Turn
+from .stats import GenerationStats
+
+
+class MessageJob:
+    # One message of send_messages_many, options are passed to send_message
+
+    def __init__(self, character_id: str, chat_id: str, text: str, **options: Any):
+        self.character_id: str = character_id
+        self.chat_id: str = chat_id
+        self.text: str = text
+        self.options: Dict[str, Any] = options
+
+    @classmethod
+    def from_value(cls, value: Union["MessageJob", Tuple[str, str, str]]) -> "MessageJob":
+        if isinstance(value, MessageJob):
+            return value
+
+        character_id, chat_id, text = value
+        return cls(character_id, chat_id, text)
+
+
+class MessageResult:
+    # Answer to a job (or why there is none), "index" is the position of the job in the input
+
+    def __init__(
+        self,
+        job: MessageJob,
+        index: int,
+        turn: Optional[Turn] = None,
+        error: Optional[BaseException] = None,
+        elapsed: float = 0.0,
+    ):
+        self.job: MessageJob = job
+        self.index: int = index
+
+        self.turn: Optional[Turn] = turn
+        self.error: Optional[BaseException] = error
+
+        # seconds from sending the message to the answer or the error
+        self.elapsed: float = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class FanOutResult:
+    # Answer of one character of fan_out with its latencies (seconds).
+    # setup_time is 0.0 when the chat was supplied, stage is where the error happened.
+
+    def __init__(self, character_id: str, index: int):
+        self.character_id: str = character_id
+        self.index: int = index
+
+        self.chat_id: Optional[str] = None
+        self.turn: Optional[Turn] = None
+
+        self.error: Optional[BaseException] = None
+        self.stage: Optional[str] = None
+
+        self.setup_time: float = 0.0
+        self.generation_time: float = 0.0
+        self.elapsed: float = 0.0
+
+        self.generation_stats: Optional[GenerationStats] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def time_to_first_frame(self) -> Optional[float]:
+        return self.generation_stats.time_to_first_frame if self.generation_stats else None
+
+
+class FanOutReport:
+    # Results of fan_out in the order of the characters, "elapsed" is the wall time of all of them
+
+    def __init__(self, results: List[FanOutResult], elapsed: float):
+        self.results: List[FanOutResult] = results
+        self.elapsed: float = elapsed
+
+    def get_result(self, character_id: str) -> Optional[FanOutResult]:
+        for result in self.results:
+            if result.character_id == character_id:
+                return result
+
+        return None
+
+    @staticmethod
+    def __percentile(values: List[float], percentile: float) -> Optional[float]:
+        if not values:
+            return None
+
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(percentile * len(ordered)) - 1))]
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        succeeded = [result for result in self.results if result.ok]
+
+        elapsed = [result.elapsed for result in succeeded]
+        first_frame = [
+            result.time_to_first_frame for result in succeeded if result.time_to_first_frame is not None
+        ]
+
+        return {
+            "characters": len(self.results),
+            "errors": len(self.results) - len(succeeded),
+            "wall_time": self.elapsed,
+            "elapsed_p50": self.__percentile(elapsed, 0.50),
+            "elapsed_p95": self.__percentile(elapsed, 0.95),
+            "elapsed_max": max(elapsed) if elapsed else None,
+            "time_to_first_frame_p50": self.__percentile(first_frame, 0.50),
+            "time_to_first_frame_p95": self.__percentile(first_frame, 0.95),
+        }
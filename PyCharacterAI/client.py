@@ -1,7 +1,12 @@
+import time
+import asyncio
+
 from typing import Any, Dict, Optional
 
 from . import methods
+from .types import Account
 
+from .hooks import Hooks
 from .requester import Requester
 
 
@@ -59,6 +64,7 @@ class AsyncClient(BaseClient):
         super().__init__()
 
         self.__requester = Requester(**kwargs)
+        self.__warm_up_timings: Dict[str, Optional[float]] = {}
 
         self.account = methods.AccountMethods(self, self.__requester)
         self.user = methods.UserMethods(self, self.__requester)
@@ -69,6 +75,13 @@ class AsyncClient(BaseClient):
     def _get_requester(self) -> Requester:
         return self.__requester
 
+    @property
+    def hooks(self) -> Hooks:
+        return self.__requester.hooks
+
+    def get_warm_up_timings(self) -> Dict[str, Optional[float]]:
+        return self.__warm_up_timings
+
     async def authenticate(self, token: str, **kwargs: Any):
         self.set_token(token)
 
@@ -76,7 +89,27 @@ class AsyncClient(BaseClient):
         if web_next_auth:
             self.set_web_next_auth(web_next_auth)
 
-        self.set_account_id(str((await self.account.fetch_me()).account_id))
+        if not kwargs.get("warm_up", False):
+            self.set_account_id(str((await self.account.fetch_me()).account_id))
+            return
+
+        # Opening connections while fetching the account,
+        # so the first message does not pay for the handshakes.
+        start = time.perf_counter()
+
+        async def fetch_me() -> Account:
+            fetch_start = time.perf_counter()
+            account = await self.account.fetch_me()
+
+            self.__warm_up_timings["fetch_me"] = time.perf_counter() - fetch_start
+            return account
+
+        account, timings = await asyncio.gather(fetch_me(), self.__requester.warm_up_async(token))
+
+        self.__warm_up_timings.update(timings)
+        self.__warm_up_timings["total"] = time.perf_counter() - start
+
+        self.set_account_id(str(account.account_id))
 
     async def close_session(self) -> None:
         await self.__requester.ws_close_async()
@@ -85,8 +118,9 @@ class AsyncClient(BaseClient):
 
 async def get_client(token: str, **kwargs: Any) -> AsyncClient:
     web_next_auth: str = str(kwargs.pop("web_next_auth", ""))
+    warm_up: bool = kwargs.pop("warm_up", False)
 
     client = AsyncClient(**kwargs)
-    await client.authenticate(token=token, web_next_auth=web_next_auth)
+    await client.authenticate(token=token, web_next_auth=web_next_auth, warm_up=warm_up)
 
     return client
@@ -0,0 +1,127 @@
+import asyncio
+
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+
+class CoalescePolicy:
+    # Limits how often a streamed answer is yielded: at most once per interval (seconds)
+    # and/or once per min_chars new characters of a candidate.
+    #
+    # Every frame carries the whole text generated so far, so frames in between are merged
+    # by keeping only the latest one for the same candidates (a frame can update one candidate
+    # or all of them). The first and the final frames are always delivered at once, a held frame
+    # is delivered when its interval passes even if nothing new arrives.
+
+    def __init__(self, interval: Optional[float] = None, min_chars: Optional[int] = None):
+        self.interval: Optional[float] = interval
+        self.min_chars: Optional[int] = min_chars
+
+        self.received: int = 0
+        self.delivered: int = 0
+
+    def __is_due(self, raw_candidates: List[Dict], lengths: Dict[str, int], elapsed: float) -> bool:
+        if self.interval is None and self.min_chars is None:
+            return True
+
+        if self.interval is not None and elapsed >= self.interval:
+            return True
+
+        if self.min_chars is not None:
+            return any(
+                len(raw_candidate.get("raw_content", "") or "") - lengths.get(raw_candidate.get("candidate_id", ""), 0)
+                >= self.min_chars
+                for raw_candidate in raw_candidates
+            )
+
+        return False
+
+    def __take(self, pending: Dict[Tuple, Dict], lengths: Dict[str, int]) -> List[Dict]:
+        raw_turns = list(pending.values())
+        pending.clear()
+
+        for raw_turn in raw_turns:
+            for raw_candidate in raw_turn["candidates"]:
+                lengths[raw_candidate.get("candidate_id", "")] = len(raw_candidate.get("raw_content", "") or "")
+
+        self.delivered += len(raw_turns)
+        return raw_turns
+
+    async def coalesce(self, raw_turns: AsyncGenerator[Dict, Any]) -> AsyncGenerator[Dict, Any]:
+        loop = asyncio.get_running_loop()
+
+        # latest undelivered frame for the same candidates and delivered text length of every candidate
+        pending: Dict[Tuple, Dict] = {}
+        lengths: Dict[str, int] = {}
+
+        last_delivery: Optional[float] = None
+        next_frame: Optional[asyncio.Future] = None
+
+        try:
+            while True:
+                if pending and self.interval is not None and next_frame is None:
+                    next_frame = asyncio.ensure_future(raw_turns.__anext__())
+
+                if next_frame is not None:
+                    if pending and self.interval is not None:
+                        # waiting for the next frame only until the held one is due
+                        done, _ = await asyncio.wait(
+                            [next_frame], timeout=max(0.0, last_delivery + self.interval - loop.time())
+                        )
+
+                        if not done:
+                            for raw_turn in self.__take(pending, lengths):
+                                yield raw_turn
+
+                            last_delivery = loop.time()
+                            continue
+
+                    frame, next_frame = next_frame, None
+
+                    try:
+                        raw_turn = await frame
+
+                    except StopAsyncIteration:
+                        break
+
+                else:
+                    try:
+                        raw_turn = await raw_turns.__anext__()
+
+                    except StopAsyncIteration:
+                        break
+
+                self.received += 1
+
+                raw_candidates = raw_turn.get("candidates")
+                key = tuple(raw_candidate.get("candidate_id", "") for raw_candidate in raw_candidates)
+
+                pending.pop(key, None)
+                pending[key] = raw_turn
+
+                if not (
+                    last_delivery is None
+                    or any(raw_candidate.get("is_final", False) for raw_candidate in raw_candidates)
+                    or self.__is_due(raw_candidates, lengths, loop.time() - last_delivery)
+                ):
+                    continue
+
+                for raw_turn in self.__take(pending, lengths):
+                    yield raw_turn
+
+                last_delivery = loop.time()
+
+            # the stream has ended without a final frame
+            for raw_turn in self.__take(pending, lengths):
+                yield raw_turn
+
+        finally:
+            if next_frame is not None:
+                next_frame.cancel()
+
+                try:
+                    await next_frame
+
+                except (Exception, asyncio.CancelledError):
+                    pass
+
+            await raw_turns.aclose()
@@ -0,0 +1,82 @@
+import json
+
+from typing import Any, Optional, Union
+
+from .exceptions import InvalidArgumentError
+
+
+class JsonCodec:
+    # Serializes request bodies and websocket frames straight to bytes
+    # and parses responses straight from bytes (standard library implementation).
+    # Invalid data always raises ValueError, whichever library is used.
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self.__orjson = orjson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.__orjson.dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self.__orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self.__encoder = msgspec.json.Encoder()
+        self.__decoder = msgspec.json.Decoder()
+        self.__decode_error = msgspec.DecodeError
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.__encoder.encode(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return self.__decoder.decode(data)
+
+        except self.__decode_error as error:
+            raise ValueError(str(error))
+
+
+CODECS = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "json": JsonCodec,
+}
+
+
+def get_codec(codec: Union[str, JsonCodec, None] = "auto") -> JsonCodec:
+    # "auto" picks the fastest installed library, falling back to the standard one
+    if isinstance(codec, JsonCodec):
+        return codec
+
+    if codec is None or codec == "auto":
+        for available_codec in CODECS.values():
+            try:
+                return available_codec()
+
+            except ImportError:
+                continue
+
+    codec_class: Optional[type] = CODECS.get(str(codec), None)
+    if codec_class is None:
+        raise InvalidArgumentError(f"Unknown json codec: {codec}")
+
+    return codec_class()
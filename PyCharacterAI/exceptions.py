@@ -7,14 +7,34 @@ class UnknownError(PyCAIError): ...
 class RequestError(PyCAIError): ...
 
 
+class TransportError(RequestError): ...
+
+
 class WebsocketError(RequestError): ...
 
 class WebsocketClosedError(WebsocketError): ...
 
+class WebsocketConnectionLostError(WebsocketError): ...
+
+class WebsocketReconnectError(WebsocketError): ...
+
+class GenerationCancelledError(WebsocketError): ...
+
 
 class SessionClosedError(RequestError): ...
 
 
+class RequestTimeoutError(RequestError): ...
+
+class ConnectTimeoutError(RequestTimeoutError): ...
+
+class FirstTokenTimeoutError(RequestTimeoutError): ...
+
+class InterTokenTimeoutError(RequestTimeoutError): ...
+
+class GenerationTimeoutError(RequestTimeoutError): ...
+
+
 class ServerError(PyCAIError): ...
 
 
@@ -0,0 +1,585 @@
+import re
+import json
+import uuid
+import asyncio
+
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qs
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .exceptions import TransportError
+from .transport import Transport, TransportResponse, TransportWebSocket
+
+
+class FakeBackend:
+    # In-process emulation of the endpoints used by the client, for tests and benchmarks
+    # without network access. Answers are generated from a small in-memory state
+    # (one account, characters, chats and turns).
+    #
+    # Character replies are streamed the way the real server does it: "update_turn" frames,
+    # each of them with the whole text generated so far, the last one marked as final.
+    # Latencies are in seconds, token_rate is in words per second (None - no delay between frames).
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        http_latency: float = 0.0,
+        ws_connect_latency: float = 0.0,
+        first_token_latency: float = 0.0,
+        token_rate: Optional[float] = None,
+        tokens_per_frame: int = 1,
+        page_size: int = 50,
+        reply: Optional[Callable[[Dict, str], str]] = None,
+    ):
+        # None accepts any token
+        self.token: Optional[str] = token
+
+        self.http_latency: float = http_latency
+        self.ws_connect_latency: float = ws_connect_latency
+        self.first_token_latency: float = first_token_latency
+
+        self.token_rate: Optional[float] = token_rate
+        self.tokens_per_frame: int = max(1, tokens_per_frame)
+
+        self.page_size: int = page_size
+
+        # builds the text of a reply from the character and the user's message
+        self.reply: Callable[[Dict, str], str] = reply or self.default_reply
+
+        self.account: Dict = {
+            "id": 1,
+            "username": "fake_user",
+            "first_name": "Fake",
+            "email": "fake@example.com",
+            "is_human": True,
+            "account": {"name": "Fake User", "avatar_type": "DEFAULT"},
+        }
+
+        self.characters: Dict[str, Dict] = {}
+        self.chats: Dict[str, Dict] = {}
+        self.turns: Dict[str, List[Dict]] = {}
+
+        self.http_requests: int = 0
+        self.ws_messages: int = 0
+        self.aborted: int = 0
+
+        self.__sockets: Set[FakeWebSocket] = set()
+        # running generations by request_id, for abort_generation
+        self.__generations: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def default_reply(character: Dict, text: str) -> str:
+        return f"{character.get('name', 'Character')} has received your message: {text}"
+
+    @staticmethod
+    def now() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    def is_authorized(self, token: Optional[str]) -> bool:
+        return self.token is None or token == self.token
+
+    def add_character(
+        self, character_id: Optional[str] = None, name: str = "Character", greeting: str = "Hello!", **options: Any
+    ) -> str:
+        character_id = character_id or str(uuid.uuid4())
+
+        self.characters[character_id] = {
+            "external_id": character_id,
+            "name": name,
+            "participant__name": name,
+            "title": options.pop("title", ""),
+            "description": options.pop("description", ""),
+            "greeting": greeting,
+            "visibility": "PUBLIC",
+            "user__username": "fake_creator",
+            **options,
+        }
+
+        return character_id
+
+    def add_turns(self, chat_id: str, amount: int) -> None:
+        # fills a chat with messages (e.g. to measure pagination)
+        chat = self.chats[chat_id]
+
+        for index in range(amount):
+            self.__add_turn(
+                chat, text=f"Message {index}", is_human=index % 2 == 0, candidate_id=str(uuid.uuid4())
+            )
+
+    def drop_connections(self) -> None:
+        # emulates a network failure of every open websocket
+        for socket in list(self.__sockets):
+            socket.drop()
+
+    # ================================================================== #
+    #                               State                                #
+    # ================================================================== #
+
+    def __get_character(self, character_id: str) -> Dict:
+        character = self.characters.get(character_id, None)
+
+        if character is None:
+            character = self.characters[self.add_character(character_id)]
+
+        return character
+
+    def __create_chat(self, chat_id: str, character_id: str) -> Dict:
+        character = self.__get_character(character_id)
+
+        chat = {
+            "chat_id": chat_id,
+            "character_id": character_id,
+            "creator_id": str(self.account["id"]),
+            "create_time": self.now(),
+            "state": "STATE_ACTIVE",
+            "type": "TYPE_ONE_ON_ONE",
+            "visibility": "VISIBILITY_PRIVATE",
+            "character_name": character["name"],
+            "character_avatar_uri": "",
+        }
+
+        self.chats[chat_id] = chat
+        self.turns[chat_id] = []
+
+        return chat
+
+    def __make_turn(
+        self, chat: Dict, is_human: bool, turn_id: Optional[str] = None, candidates: Optional[List[Dict]] = None
+    ) -> Dict:
+        now = self.now()
+        candidates = candidates or []
+
+        if is_human:
+            author = {"author_id": str(self.account["id"]), "is_human": True, "name": self.account["username"]}
+        else:
+            author = {"author_id": chat["character_id"], "name": chat["character_name"]}
+
+        return {
+            "turn_key": {"chat_id": chat["chat_id"], "turn_id": turn_id or str(uuid.uuid4())},
+            "create_time": now,
+            "last_update_time": now,
+            "state": "STATE_OK",
+            "author": author,
+            "candidates": candidates,
+            "primary_candidate_id": candidates[0]["candidate_id"] if candidates else None,
+        }
+
+    def __make_candidate(self, candidate_id: str, text: str, is_final: bool = True) -> Dict:
+        return {"candidate_id": candidate_id, "raw_content": text, "is_final": is_final, "create_time": self.now()}
+
+    def __add_turn(
+        self, chat: Dict, text: str, is_human: bool, candidate_id: str, turn_id: Optional[str] = None
+    ) -> Dict:
+        turn = self.__make_turn(chat, is_human, turn_id, [self.__make_candidate(candidate_id, text)])
+        self.turns[chat["chat_id"]].append(turn)
+
+        return turn
+
+    def __find_turn(self, turn_key: Dict) -> Optional[Dict]:
+        for turn in self.turns.get(turn_key.get("chat_id", ""), []):
+            if turn["turn_key"]["turn_id"] == turn_key.get("turn_id", None):
+                return turn
+
+        return None
+
+    @staticmethod
+    def __find_candidate(turn: Dict, candidate_id: Optional[str]) -> Optional[Dict]:
+        for candidate in turn["candidates"]:
+            if candidate["candidate_id"] == candidate_id:
+                return candidate
+
+        return None
+
+    # ================================================================== #
+    #                                HTTP                                #
+    # ================================================================== #
+
+    @staticmethod
+    def __error(status_code: int, comment: str) -> Tuple[int, Dict]:
+        return status_code, {"command": "neo_error", "comment": comment}
+
+    def __get_chat_response(self, chat_id: str) -> Tuple[int, Dict]:
+        chat = self.chats.get(chat_id, None)
+        if chat is None:
+            return self.__error(404, "Chat not found.")
+
+        return 200, {"chat": chat}
+
+    def __get_chats_response(self, character_id: Optional[str], num_preview_turns: int) -> Tuple[int, Dict]:
+        chats = []
+
+        for chat in reversed(list(self.chats.values())):
+            if character_id and chat["character_id"] != character_id:
+                continue
+
+            preview_turns = list(reversed(self.turns[chat["chat_id"]]))[:num_preview_turns]
+            chats.append({**chat, "preview_turns": preview_turns})
+
+        return 200, {"chats": chats}
+
+    def __get_turns_response(self, chat_id: str, next_token: Optional[str]) -> Tuple[int, Dict]:
+        if chat_id not in self.chats:
+            return self.__error(404, "Chat not found.")
+
+        # newest messages first, next_token is the offset of the following page
+        turns = list(reversed(self.turns[chat_id]))
+
+        offset = int(next_token) if next_token and next_token.isdigit() else 0
+        page = turns[offset:offset + self.page_size]
+
+        meta_next_token = str(offset + self.page_size) if offset + self.page_size < len(turns) else None
+
+        return 200, {"turns": page, "meta": {"next_token": meta_next_token}}
+
+    def __handle_http(self, method: str, url: str, body: Any) -> Tuple[int, Dict]:
+        parsed_url = urlparse(url)
+        route = f"{method} {parsed_url.netloc}{parsed_url.path}"
+        query = {key: values[0] for key, values in parse_qs(parsed_url.query).items()}
+
+        if route == "GET plus.character.ai/chat/user/":
+            return 200, {"user": {"user": self.account}}
+
+        if route == "GET neo.character.ai/ping/":
+            return 200, {"status": "pong"}
+
+        if route == "POST neo.character.ai/character/v1/get_character_info":
+            character = self.characters.get(body.get("external_id", ""), None)
+            if character is None:
+                return 200, {"status": "NOT_OK", "error": "Character not found."}
+
+            return 200, {"character": character, "status": "OK"}
+
+        if route == "GET neo.character.ai/chats/":
+            return self.__get_chats_response(query.get("character_ids", None), int(query.get("num_preview_turns", 2)))
+
+        if route == "GET neo.character.ai/chats/recent/":
+            return self.__get_chats_response(None, 0)
+
+        match = re.fullmatch(r"(GET|PATCH|POST) neo\.character\.ai/chat/([^/]+)/(update_name|archive|unarchive|copy)?", route)
+        if match:
+            chat_id, action = match.group(2), match.group(3)
+
+            status_code, response = self.__get_chat_response(chat_id)
+            if status_code != 200 or action is None:
+                return status_code, response
+
+            if action == "update_name":
+                self.chats[chat_id]["name"] = body.get("name", "")
+
+            elif action == "copy":
+                new_chat = self.__create_chat(str(uuid.uuid4()), self.chats[chat_id]["character_id"])
+                self.turns[new_chat["chat_id"]] = [
+                    {**turn, "turn_key": {**turn["turn_key"], "chat_id": new_chat["chat_id"]}}
+                    for turn in self.turns[chat_id]
+                ]
+                return 200, {"new_chat_id": new_chat["chat_id"]}
+
+            else:
+                self.chats[chat_id]["state"] = "STATE_ARCHIVED" if action == "archive" else "STATE_ACTIVE"
+
+            return 200, {}
+
+        match = re.fullmatch(r"GET neo\.character\.ai/turns/([^/]+)/", route)
+        if match:
+            return self.__get_turns_response(match.group(1), query.get("next_token", None))
+
+        match = re.fullmatch(r"POST neo\.character\.ai/turns/([^/]+)/remove", route)
+        if match:
+            chat_id = match.group(1)
+            if chat_id not in self.chats:
+                return self.__error(404, "Chat not found.")
+
+            turn_ids = body.get("turn_ids", [])
+            self.turns[chat_id] = [turn for turn in self.turns[chat_id] if turn["turn_key"]["turn_id"] not in turn_ids]
+            return 200, {}
+
+        return self.__error(404, f"{method} {url} is not emulated.")
+
+    async def handle_http(
+        self, method: str, url: str, headers: Dict, body: Any
+    ) -> Tuple[int, List[Tuple[str, Optional[str]]], bytes]:
+        self.http_requests += 1
+
+        if self.http_latency:
+            await asyncio.sleep(self.http_latency)
+
+        token = None
+        for key, value in headers.items():
+            if key.lower() == "authorization" and str(value).startswith("Token "):
+                token = str(value)[len("Token "):]
+
+        if not self.is_authorized(token):
+            status_code, response = 401, {"detail": "Invalid token."}
+
+        else:
+            if isinstance(body, (bytes, str)):
+                body = json.loads(body) if body else {}
+
+            status_code, response = self.__handle_http(method, url, body or {})
+
+        return status_code, [("content-type", "application/json")], json.dumps(response).encode("utf-8")
+
+    # ================================================================== #
+    #                             Websockets                             #
+    # ================================================================== #
+
+    async def __stream_candidate(
+        self,
+        send: Callable[[Dict], Awaitable[None]],
+        request_id: Optional[str],
+        turn: Dict,
+        candidate_id: str,
+        text: str,
+    ) -> Dict:
+        words = text.split(" ")
+
+        if self.first_token_latency:
+            await asyncio.sleep(self.first_token_latency)
+
+        for end in range(self.tokens_per_frame, len(words), self.tokens_per_frame):
+            candidate = self.__make_candidate(candidate_id, " ".join(words[:end]), is_final=False)
+            await send({"command": "update_turn", "request_id": request_id, "turn": {**turn, "candidates": [candidate]}})
+
+            if self.token_rate:
+                await asyncio.sleep(self.tokens_per_frame / self.token_rate)
+
+        candidate = self.__make_candidate(candidate_id, text, is_final=True)
+        await send({"command": "update_turn", "request_id": request_id, "turn": {**turn, "candidates": [candidate]}})
+
+        return candidate
+
+    async def __generate(
+        self, send: Callable[[Dict], Awaitable[None]], request_id: Optional[str], turn: Dict, text: str, amount: int
+    ) -> None:
+        chat = self.chats[turn["turn_key"]["chat_id"]]
+        character = self.__get_character(chat["character_id"])
+
+        # a new candidate becomes the primary one, like in the web client
+        candidate_ids = [str(uuid.uuid4()) for _ in range(amount)]
+        turn["primary_candidate_id"] = candidate_ids[0]
+
+        if request_id is not None:
+            self.__generations[request_id] = asyncio.current_task()
+
+        try:
+            candidates = await asyncio.gather(*[
+                self.__stream_candidate(send, request_id, turn, candidate_id, self.reply(character, text))
+                for candidate_id in candidate_ids
+            ])
+
+        finally:
+            self.__generations.pop(request_id, None)
+
+        turn["candidates"] = turn["candidates"] + list(candidates)
+
+    async def handle_ws(self, message: Dict, send: Callable[[Dict], Awaitable[None]]) -> None:
+        self.ws_messages += 1
+
+        command = message.get("command", None)
+        request_id = message.get("request_id", None)
+        payload = message.get("payload", {})
+
+        async def error(comment: str) -> None:
+            await send({"command": "neo_error", "request_id": request_id, "comment": comment})
+
+        if command == "create_chat":
+            raw_chat = payload.get("chat", {})
+            chat = self.__create_chat(raw_chat.get("chat_id", str(uuid.uuid4())), raw_chat.get("character_id", ""))
+
+            await send({"command": "create_chat_response", "request_id": request_id, "chat": chat})
+
+            if payload.get("with_greeting", True):
+                greeting = self.characters[chat["character_id"]]["greeting"]
+                turn = self.__add_turn(chat, text=greeting, is_human=False, candidate_id=str(uuid.uuid4()))
+                await send({"command": "add_turn", "request_id": request_id, "turn": turn})
+
+        elif command == "create_and_generate_turn":
+            raw_turn = payload.get("turn", {})
+            chat = self.chats.get(raw_turn.get("turn_key", {}).get("chat_id", ""), None)
+            if chat is None:
+                return await error("Chat not found.")
+
+            raw_candidate = raw_turn.get("candidates", [{}])[0]
+            text = raw_candidate.get("raw_content", "")
+
+            human_turn = self.__add_turn(
+                chat,
+                text=text,
+                is_human=True,
+                candidate_id=raw_candidate.get("candidate_id", str(uuid.uuid4())),
+                turn_id=raw_turn.get("turn_key", {}).get("turn_id", None),
+            )
+            await send({"command": "add_turn", "request_id": request_id, "turn": human_turn})
+
+            turn = self.__make_turn(chat, is_human=False)
+            self.turns[chat["chat_id"]].append(turn)
+
+            await self.__generate(send, request_id, turn, text, max(1, payload.get("num_candidates", 1)))
+
+        elif command == "generate_turn_candidate":
+            turn = self.__find_turn(payload.get("turn_key", {}))
+            if turn is None:
+                return await error("Turn not found.")
+
+            # the reply is generated for the last message of the user before this turn
+            turns = self.turns[turn["turn_key"]["chat_id"]]
+            previous = [item for item in turns[:turns.index(turn)] if item["author"].get("is_human", False)]
+            text = previous[-1]["candidates"][0]["raw_content"] if previous else ""
+
+            await self.__generate(send, request_id, turn, text, max(1, payload.get("num_candidates", 1)))
+
+        elif command == "edit_turn_candidate":
+            turn = self.__find_turn(payload.get("turn_key", {}))
+            candidate = self.__find_candidate(turn, payload.get("current_candidate_id", None)) if turn else None
+            if candidate is None:
+                return await error("Candidate not found.")
+
+            candidate["raw_content"] = payload.get("new_candidate_raw_content", "")
+            await send({"command": "update_turn", "request_id": request_id, "turn": turn})
+
+        elif command == "set_turn_pin":
+            turn = self.__find_turn(payload.get("turn_key", {}))
+            if turn is None:
+                return await error("Turn not found.")
+
+            turn["is_pinned"] = payload.get("is_pinned", False)
+            await send({"command": "update_turn", "request_id": request_id, "turn": turn})
+
+        elif command == "update_primary_candidate":
+            turn = self.__find_turn(payload.get("turn_key", {}))
+            if turn is None or self.__find_candidate(turn, payload.get("candidate_id", None)) is None:
+                return await error("Candidate not found.")
+
+            turn["primary_candidate_id"] = payload["candidate_id"]
+            await send({"command": "ok", "request_id": request_id})
+
+        elif command == "abort_generation":
+            generation = self.__generations.pop(payload.get("request_id", ""), None)
+            if generation is not None:
+                generation.cancel()
+                self.aborted += 1
+
+            await send({"command": "ok", "request_id": request_id})
+
+        else:
+            await error(f"Command {command} is not emulated.")
+
+    def register(self, socket: "FakeWebSocket") -> None:
+        self.__sockets.add(socket)
+
+    def unregister(self, socket: "FakeWebSocket") -> None:
+        self.__sockets.discard(socket)
+
+
+class FakeResponse(TransportResponse):
+    def __init__(self, status_code: int, headers: List[Tuple[str, Optional[str]]], content: bytes):
+        super().__init__(status_code, headers)
+
+        self.__content = content
+
+    @property
+    def content(self) -> bytes:
+        return self.__content
+
+    async def iter_content(self, chunk_size: Optional[int] = None):
+        chunk_size = chunk_size or 65536
+
+        for start in range(0, len(self.__content), chunk_size):
+            yield self.__content[start:start + chunk_size]
+
+
+class FakeWebSocket(TransportWebSocket):
+    def __init__(self, backend: FakeBackend):
+        self.__backend = backend
+
+        self.__frames: asyncio.Queue = asyncio.Queue()
+        self.__tasks: Set[asyncio.Task] = set()
+        self.__closed: bool = False
+
+        backend.register(self)
+
+    async def __push(self, message: Dict) -> None:
+        if not self.__closed:
+            # frames without request_id must not have this key at all
+            if message.get("request_id", "") is None:
+                message = {key: value for key, value in message.items() if key != "request_id"}
+
+            self.__frames.put_nowait(json.dumps(message).encode("utf-8"))
+
+    async def send(self, data: bytes) -> None:
+        if self.__closed:
+            raise TransportError("Websocket is closed.")
+
+        task = asyncio.create_task(self.__backend.handle_ws(json.loads(data), self.__push))
+
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def recv(self) -> bytes:
+        if self.__closed and self.__frames.empty():
+            raise TransportError("Websocket is closed.")
+
+        frame = await self.__frames.get()
+        if frame is None:
+            raise TransportError("Websocket is closed.")
+
+        return frame
+
+    async def ping(self) -> None:
+        if self.__closed:
+            raise TransportError("Websocket is closed.")
+
+    def is_alive(self) -> bool:
+        return not self.__closed
+
+    def drop(self) -> None:
+        if self.__closed:
+            return
+
+        self.__closed = True
+        self.__backend.unregister(self)
+
+        for task in self.__tasks:
+            task.cancel()
+
+        self.__frames.put_nowait(None)
+
+    async def close(self) -> None:
+        self.drop()
+
+
+class FakeTransport(Transport):
+    # Transport answering from FakeBackend, e.g.:
+    #
+    # backend = FakeBackend(token_rate=50)
+    # client = Client(transport=FakeTransport(backend))
+
+    def __init__(self, backend: Optional[FakeBackend] = None):
+        self.backend: FakeBackend = backend or FakeBackend()
+
+        self.__open: bool = False
+
+    def is_open(self) -> bool:
+        return self.__open
+
+    async def open(self) -> None:
+        self.__open = True
+
+    async def close(self) -> None:
+        self.__open = False
+
+    async def request(
+        self, method: str, url: str, headers: Dict, cookies: Dict, body=None, stream: bool = False
+    ) -> TransportResponse:
+        status_code, response_headers, content = await self.backend.handle_http(method, url, headers, body)
+        return FakeResponse(status_code, response_headers, content)
+
+    async def ws_connect(self, url: str, cookies: Dict) -> TransportWebSocket:
+        if self.backend.ws_connect_latency:
+            await asyncio.sleep(self.backend.ws_connect_latency)
+
+        token = str(cookies.get("HTTP_AUTHORIZATION", ""))
+        if not self.backend.is_authorized(token[len("Token "):] if token.startswith("Token ") else None):
+            raise TransportError("Websocket handshake was rejected.")
+
+        return FakeWebSocket(self.backend)
@@ -0,0 +1,76 @@
+import math
+
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class HedgePolicy:
+    # Decides when a second identical request is sent for a slow idempotent read.
+    #
+    # The delay is a percentile of recent latencies of the same endpoint (e.g. p95),
+    # so only the slowest requests are hedged. Budget limits how many requests
+    # can be hedged at all (0.05 - no more than 5% of hedgeable requests).
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        default_delay: float = 0.5,
+        min_delay: float = 0.05,
+        max_delay: float = 5.0,
+        budget: float = 0.05,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        self.percentile: float = percentile
+
+        self.default_delay: float = default_delay
+        self.min_delay: float = min_delay
+        self.max_delay: float = max_delay
+
+        self.budget: float = budget
+
+        self.window: int = window
+        self.min_samples: int = min_samples
+
+        self.__latencies: Dict[str, Deque[float]] = {}
+
+        self.requests: int = 0
+        self.hedged: int = 0
+        self.hedge_wins: int = 0
+
+    def get_delay(self, key: str) -> float:
+        latencies = self.__latencies.get(key, None)
+
+        if not latencies or len(latencies) < self.min_samples:
+            return self.default_delay
+
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(self.percentile * len(ordered)) - 1))
+
+        return min(self.max_delay, max(self.min_delay, ordered[index]))
+
+    def record(self, key: str, latency: float) -> None:
+        latencies = self.__latencies.get(key, None)
+        if latencies is None:
+            latencies = deque(maxlen=self.window)
+            self.__latencies[key] = latencies
+
+        latencies.append(latency)
+
+    def start_request(self) -> None:
+        self.requests += 1
+
+    def try_hedge(self) -> bool:
+        if self.hedged + 1 > self.budget * self.requests:
+            return False
+
+        self.hedged += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Optional[float]]:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "hedged_ratio": self.hedged / self.requests if self.requests else 0.0,
+        }
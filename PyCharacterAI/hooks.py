@@ -0,0 +1,127 @@
+import time
+import asyncio
+import inspect
+
+from typing import Any, Callable, Dict, List, Optional
+
+from .exceptions import InvalidArgumentError
+
+
+class Event:
+    # What happened to a request or a websocket, passed to every handler of its name.
+    # Timestamps are time.monotonic() values, "started" is the start of the request
+    # attempt (or of the connection), so "elapsed" is how long it took until this event.
+
+    def __init__(
+        self,
+        name: str,
+        endpoint: str,
+        method: str,
+        url: Optional[str] = None,
+        operation: Optional[str] = None,
+        started: Optional[float] = None,
+        status_code: Optional[int] = None,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        attempt: int = 1,
+        delay: Optional[float] = None,
+        error: Optional[BaseException] = None,
+        command: Optional[str] = None,
+        request_id: Optional[str] = None,
+        connection: Optional[int] = None,
+    ):
+        self.name: str = name
+        self.timestamp: float = time.monotonic()
+        self.started: float = started if started is not None else self.timestamp
+
+        # url without ids (e.g. "neo.character.ai/turns/{id}/") or websocket command
+        self.endpoint: str = endpoint
+        # HTTP method or "WS"
+        self.method: str = method
+        self.url: Optional[str] = url
+        # method of the client that made the request (e.g. "chat.fetch_messages")
+        self.operation: Optional[str] = operation
+
+        self.status_code: Optional[int] = status_code
+        self.bytes_sent: int = bytes_sent
+        self.bytes_received: int = bytes_received
+
+        # retries only
+        self.attempt: int = attempt
+        self.delay: Optional[float] = delay
+
+        self.error: Optional[BaseException] = error
+
+        # websockets only
+        self.command: Optional[str] = command
+        self.request_id: Optional[str] = request_id
+        self.connection: Optional[int] = connection
+
+    @property
+    def elapsed(self) -> float:
+        return self.timestamp - self.started
+
+    def __repr__(self) -> str:
+        return f"<Event {self.name} {self.method} {self.endpoint} status={self.status_code} elapsed={self.elapsed:.4f}>"
+
+
+class Hooks:
+    # Handlers of request lifecycle events. A handler can be a function or a coroutine
+    # function (coroutines are scheduled and not awaited, so they never slow a request down).
+    # Exceptions raised by handlers are ignored.
+    #
+    # hooks = Hooks()
+    # hooks.on("request_body", lambda event: print(event.endpoint, event.elapsed))
+    # client = Client(hooks=hooks)
+
+    EVENTS = [
+        "request_start",
+        "request_headers",
+        "request_body",
+        "request_retry",
+        "request_error",
+        "ws_connect",
+        "ws_send",
+        "ws_frame",
+        "ws_stream_end",
+        "ws_close",
+    ]
+
+    def __init__(self):
+        self.__handlers: Dict[str, List[Callable[[Event], Any]]] = {}
+
+    def on(self, name: str, handler: Optional[Callable[[Event], Any]] = None):
+        # "*" subscribes to every event, can be used as a decorator: @hooks.on("ws_frame")
+        if name != "*" and name not in self.EVENTS:
+            raise InvalidArgumentError(f"Unknown event: {name}")
+
+        def register(function: Callable[[Event], Any]) -> Callable[[Event], Any]:
+            self.__handlers.setdefault(name, []).append(function)
+            return function
+
+        if handler is None:
+            return register
+
+        return register(handler)
+
+    def off(self, name: str, handler: Callable[[Event], Any]) -> None:
+        handlers = self.__handlers.get(name, [])
+
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def has(self, name: str) -> bool:
+        # lets the requester skip building events nobody listens to
+        return bool(self.__handlers.get(name, None) or self.__handlers.get("*", None))
+
+    def emit(self, event: Event) -> None:
+        for handler in self.__handlers.get(event.name, []) + self.__handlers.get("*", []):
+            try:
+                result = handler(event)
+
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+            except Exception:
+                continue
@@ -1,5 +1,4 @@
 import uuid
-import json
 from typing import Any, List, Dict, Optional
 
 from ..types import Account, Persona, CharacterShort, Voice
@@ -14,6 +13,7 @@ from ..exceptions import (
 )
 
 from ..requester import Requester
+from ..retry import DEFAULT_RETRY_POLICY
 
 
 class AccountMethods:
@@ -24,7 +24,11 @@ class AccountMethods:
     async def fetch_me(self, **kwargs: Any) -> Account:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/user/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.fetch_me",
+            },
         )
 
         if request.status_code == 200:
@@ -35,7 +39,11 @@ class AccountMethods:
     async def fetch_my_settings(self, **kwargs: Any) -> Dict:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/user/settings/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.fetch_my_settings",
+            },
         )
 
         if request.status_code == 200:
@@ -46,7 +54,11 @@ class AccountMethods:
     async def fetch_my_followers(self, **kwargs: Any) -> List:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/user/followers/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.fetch_my_followers",
+            },
         )
 
         if request.status_code == 200:
@@ -57,7 +69,11 @@ class AccountMethods:
     async def fetch_my_following(self, **kwargs: Any) -> List:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/user/following/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.fetch_my_following",
+            },
         )
 
         if request.status_code == 200:
@@ -68,7 +84,11 @@ class AccountMethods:
     async def fetch_my_persona(self, persona_id: str, **kwargs: Any) -> Persona:
         request = await self.__requester.request_async(
             url=f"https://plus.character.ai/chat/persona/?id={persona_id}",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.fetch_my_persona",
+            },
         )
 
         if request.status_code == 200:
@@ -81,7 +101,11 @@ class AccountMethods:
     async def fetch_my_personas(self, **kwargs: Any) -> List[Persona]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/personas/?force_refresh=1",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.fetch_my_personas",
+            },
         )
 
         if request.status_code == 200:
@@ -98,7 +122,11 @@ class AccountMethods:
     async def fetch_my_characters(self, **kwargs: Any) -> List[CharacterShort]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/characters/?scope=user",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.fetch_my_characters",
+            },
         )
 
         if request.status_code == 200:
@@ -115,7 +143,11 @@ class AccountMethods:
     async def fetch_my_upvoted_characters(self, **kwargs: Any) -> List[CharacterShort]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/user/characters/upvoted/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.fetch_my_upvoted_characters",
+            },
         )
 
         if request.status_code == 200:
@@ -132,7 +164,11 @@ class AccountMethods:
     async def fetch_my_voices(self, **kwargs: Any) -> List[Voice]:
         request = await self.__requester.request_async(
             url="https://neo.character.ai/multimodal/api/v1/voices/user",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.fetch_my_voices",
+            },
         )
         
         response = request.json()
@@ -176,7 +212,9 @@ class AccountMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps(settings),
+                "json": settings,
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.__update_settings",
             },
         )
 
@@ -224,7 +262,9 @@ class AccountMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps(new_account_info),
+                "json": new_account_info,
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.edit_account",
             },
         )
 
@@ -252,25 +292,25 @@ class AccountMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps(
-                    {
-                        "avatar_file_name": "",
-                        "avatar_rel_path": avatar_rel_path,
-                        "base_img_prompt": "",
-                        "categories": [],
-                        "copyable": False,
-                        "definition": definition,
-                        "description": "This is my persona.",
-                        "greeting": "Hello! This is my persona",
-                        "identifier": f"id:{str(uuid.uuid4())}",
-                        "img_gen_enabled": False,
-                        "name": name,
-                        "strip_img_prompt_from_msg": False,
-                        "title": name,
-                        "visibility": "PRIVATE",
-                        "voice_id": "",
-                    }
-                ),
+                "json": {
+                    "avatar_file_name": "",
+                    "avatar_rel_path": avatar_rel_path,
+                    "base_img_prompt": "",
+                    "categories": [],
+                    "copyable": False,
+                    "definition": definition,
+                    "description": "This is my persona.",
+                    "greeting": "Hello! This is my persona",
+                    "identifier": f"id:{str(uuid.uuid4())}",
+                    "img_gen_enabled": False,
+                    "name": name,
+                    "strip_img_prompt_from_msg": False,
+                    "title": name,
+                    "visibility": "PRIVATE",
+                    "voice_id": "",
+                },
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.create_persona",
             },
         )
 
@@ -333,7 +373,9 @@ class AccountMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps(payload),
+                "json": payload,
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.edit_persona",
             },
         )
 
@@ -378,7 +420,9 @@ class AccountMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps(payload),
+                "json": payload,
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.delete_persona",
             },
         )
 
@@ -427,7 +471,9 @@ class AccountMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps({"voice_id": voice_id}) if voice_id else None,
+                "json": {"voice_id": voice_id} if voice_id else None,
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "account.set_voice",
             },
         )
 
@@ -15,6 +15,7 @@ from ..exceptions import (
 )
 
 from ..requester import Requester
+from ..retry import DEFAULT_RETRY_POLICY
 
 
 class CharacterMethods:
@@ -25,7 +26,11 @@ class CharacterMethods:
     async def fetch_characters_by_category(self, **kwargs: Any) -> Dict[str, List[CharacterShort]]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/curated_categories/characters/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "character.fetch_characters_by_category",
+            },
         )
 
         if request.status_code == 200:
@@ -48,7 +53,11 @@ class CharacterMethods:
     async def fetch_recommended_characters(self, **kwargs: Any) -> List[CharacterShort]:
         request = await self.__requester.request_async(
             url="https://neo.character.ai/recommendation/v1/user",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "character.fetch_recommended_characters",
+            },
         )
         
         response = request.json()
@@ -70,7 +79,11 @@ class CharacterMethods:
     async def fetch_featured_characters(self, **kwargs: Any) -> List[CharacterShort]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/characters/featured_v2/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "character.fetch_featured_characters",
+            },
         )
         
         response = request.json()
@@ -92,7 +105,11 @@ class CharacterMethods:
     async def fetch_similar_characters(self, character_id: str, **kwargs: Any) -> List[CharacterShort]:
         request = await self.__requester.request_async(
             url=f"https://neo.character.ai/recommendation/v1/character/{character_id}",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "character.fetch_similar_characters",
+            },
         )
         
         response = request.json()
@@ -117,7 +134,11 @@ class CharacterMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps({"external_id": character_id}),
+                "json": {"external_id": character_id},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "hedge": kwargs.get("hedge", True),
+                "single_flight": True,
+                "operation": "character.fetch_character_info",
             },
         )
 
@@ -144,7 +165,11 @@ class CharacterMethods:
         request = await self.__requester.request_async(
             url=f"https://character.ai/api/trpc/search.search?batch=1"
                 f"&input={json.dumps(payload, separators=(',', ':'))}",
-            options={"cookies": {"web-next-auth": web_next_auth} if web_next_auth else {}}
+            options={
+                "cookies": {"web-next-auth": web_next_auth} if web_next_auth else {},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "character.search_characters",
+            },
         )
         
         if request.status_code == 200:
@@ -165,7 +190,11 @@ class CharacterMethods:
         request = await self.__requester.request_async(
             url=f"https://character.ai/api/trpc/search.searchCreators?batch=1"
                 f"&input={json.dumps(payload, separators=(',', ':'))}",
-            options={"headers": self.__client.get_headers(authorization=False)},
+            options={
+                "headers": self.__client.get_headers(authorization=False),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "character.search_creators",
+            },
         )
 
         if request.status_code == 200:
@@ -180,7 +209,9 @@ class CharacterMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps({"external_id": character_id, "vote": vote}),
+                "json": {"external_id": character_id, "vote": vote},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "character.character_vote",
             },
         )
 
@@ -232,25 +263,25 @@ class CharacterMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps(
-                    {
-                        "avatar_rel_path": avatar_rel_path,
-                        "base_img_prompt": "",
-                        "categories": [],
-                        "copyable": copyable,
-                        "default_voice_id": default_voice_id,
-                        "definition": definition,
-                        "description": description,
-                        "greeting": greeting,
-                        "identifier": f"id:{str(uuid.uuid4())}",
-                        "img_gen_enabled": False,
-                        "name": name,
-                        "strip_img_prompt_from_msg": False,
-                        "title": title,
-                        "visibility": visibility,
-                        "voice_id": "",
-                    }
-                ),
+                "json": {
+                    "avatar_rel_path": avatar_rel_path,
+                    "base_img_prompt": "",
+                    "categories": [],
+                    "copyable": copyable,
+                    "default_voice_id": default_voice_id,
+                    "definition": definition,
+                    "description": description,
+                    "greeting": greeting,
+                    "identifier": f"id:{str(uuid.uuid4())}",
+                    "img_gen_enabled": False,
+                    "name": name,
+                    "strip_img_prompt_from_msg": False,
+                    "title": title,
+                    "visibility": visibility,
+                    "voice_id": "",
+                },
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "character.create_character",
             },
         )
 
@@ -305,26 +336,26 @@ class CharacterMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps(
-                    {
-                        "archived": False,
-                        "avatar_rel_path": avatar_rel_path,
-                        "base_img_prompt": "",
-                        "categories": [],
-                        "copyable": copyable,
-                        "default_voice_id": default_voice_id,
-                        "definition": definition,
-                        "description": description,
-                        "external_id": character_id,
-                        "greeting": greeting,
-                        "img_gen_enabled": False,
-                        "name": name,
-                        "strip_img_prompt_from_msg": False,
-                        "title": title,
-                        "visibility": visibility,
-                        "voice_id": "",
-                    }
-                ),
+                "json": {
+                    "archived": False,
+                    "avatar_rel_path": avatar_rel_path,
+                    "base_img_prompt": "",
+                    "categories": [],
+                    "copyable": copyable,
+                    "default_voice_id": default_voice_id,
+                    "definition": definition,
+                    "description": description,
+                    "external_id": character_id,
+                    "greeting": greeting,
+                    "img_gen_enabled": False,
+                    "name": name,
+                    "strip_img_prompt_from_msg": False,
+                    "title": title,
+                    "visibility": visibility,
+                    "voice_id": "",
+                },
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "character.edit_character",
             },
         )
 
@@ -1,10 +1,13 @@
+import time
 import uuid
-import json
+import asyncio
 
-from typing import Optional, List, Tuple, AsyncGenerator, Any, Union
+from typing import Callable, Dict, Iterable, Optional, List, Set, Tuple, AsyncGenerator, Any, Union
 from urllib.parse import quote
 
-from ..types import Chat, ChatHistory, Turn
+from ..types import Chat, ChatHistory, Turn, TurnCandidate, TurnDelta, TurnUpdate
+from ..batch import FanOutReport, FanOutResult, MessageJob, MessageResult
+from ..stats import GenerationStats
 from ..exceptions import (
     FetchError,
     EditError,
@@ -13,9 +16,14 @@ from ..exceptions import (
     ActionError,
     DeleteError,
     SessionClosedError,
+    InvalidArgumentError,
+    FirstTokenTimeoutError,
+    InterTokenTimeoutError,
+    GenerationTimeoutError,
 )
 
-from ..requester import Requester
+from ..requester import GenerationStream, Requester
+from ..retry import DEFAULT_RETRY_POLICY
 
 
 class ChatMethods:
@@ -23,13 +31,267 @@ class ChatMethods:
         self.__client = client
         self.__requester = requester
 
+    @staticmethod
+    def __is_token_frame(raw_response: Optional[Dict]) -> bool:
+        if not raw_response or raw_response.get("command", None) not in ["add_turn", "update_turn"]:
+            return False
+
+        return not raw_response.get("turn", {}).get("author", {}).get("is_human", False)
+
+    async def __receive_with_deadlines(
+        self,
+        request: AsyncGenerator,
+        timeouts: Dict[str, Optional[float]],
+        stats: Optional[GenerationStats] = None,
+    ) -> AsyncGenerator:
+        # Every frame is awaited until the nearest deadline. When it is missed,
+        # the request is closed, so its stream is unregistered from the socket.
+        first_token_timeout = timeouts.get("first_token_timeout", None)
+        inter_token_timeout = timeouts.get("inter_token_timeout", None)
+        generation_timeout = timeouts.get("generation_timeout", None)
+
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        last_token: Optional[float] = None
+
+        try:
+            while True:
+                deadlines = []
+
+                if generation_timeout:
+                    deadlines.append((start + generation_timeout, GenerationTimeoutError(
+                        f"Generation was not finished in {generation_timeout} seconds."
+                    )))
+
+                if first_token_timeout and last_token is None:
+                    deadlines.append((start + first_token_timeout, FirstTokenTimeoutError(
+                        f"No response was received in {first_token_timeout} seconds."
+                    )))
+
+                if inter_token_timeout and last_token is not None:
+                    deadlines.append((last_token + inter_token_timeout, InterTokenTimeoutError(
+                        f"No response update was received in {inter_token_timeout} seconds."
+                    )))
+
+                try:
+                    if not deadlines:
+                        raw_response = await request.__anext__()
+
+                    else:
+                        deadline, error = min(deadlines, key=lambda item: item[0])
+                        raw_response = await asyncio.wait_for(
+                            request.__anext__(), timeout=max(0.0, deadline - loop.time())
+                        )
+
+                except StopAsyncIteration:
+                    return
+
+                except asyncio.TimeoutError:
+                    raise error
+
+                if self.__is_token_frame(raw_response):
+                    last_token = loop.time()
+
+                    if stats is not None:
+                        stats.record_frame(raw_response)
+
+                yield raw_response
+
+        finally:
+            await request.aclose()
+
+    def __new_generation_stats(
+        self, ws_message: Dict, character_id: str, chat_id: str, **kwargs: Any
+    ) -> Optional[GenerationStats]:
+        # collected only when someone reads them
+        if not self.__requester.wants_generation_stats(**kwargs):
+            return None
+
+        turn_id = ws_message["payload"].get("turn_key", {}).get("turn_id", None)
+        return GenerationStats(
+            ws_message["command"],
+            str(character_id),
+            str(chat_id),
+            turn_id,
+            num_candidates=ws_message["payload"].get("num_candidates", 1),
+        )
+
+    async def __finish_generation_stats(self, turn: Turn, stats: Optional[GenerationStats], **kwargs: Any) -> None:
+        if stats is None:
+            return
+
+        if kwargs.get("generation_stats", False):
+            turn.generation_stats = stats
+
+        await self.__requester.publish_generation_stats(stats, kwargs.get("on_generation_stats", None))
+
+    @staticmethod
+    def __get_num_candidates(**kwargs: Any) -> int:
+        num_candidates = kwargs.get("num_candidates", 1)
+
+        if not isinstance(num_candidates, int) or num_candidates < 1:
+            raise InvalidArgumentError(f"Invalid number of candidates: {num_candidates}")
+
+        return num_candidates
+
+    @staticmethod
+    def __get_stream_mode(**kwargs: Any) -> str:
+        stream_mode = kwargs.get("stream_mode", None) or "turn"
+
+        if stream_mode not in ["turn", "update", "delta"]:
+            raise InvalidArgumentError(f"Unknown stream mode: {stream_mode}")
+
+        return stream_mode
+
+    @staticmethod
+    def __get_delta(
+        raw_turn: Dict, raw_candidate: Dict, texts: Dict[str, str], turn: Optional[Turn]
+    ) -> Optional[TurnDelta]:
+        # every frame carries the whole text so far, only its new part is passed on
+        candidate_id = raw_candidate.get("candidate_id", "")
+        is_final = raw_candidate.get("is_final", False)
+
+        previous = texts.get(candidate_id, "")
+        text = raw_candidate.get("raw_content", "") or ""
+        texts[candidate_id] = text
+
+        if text.startswith(previous):
+            offset = len(previous)
+
+        else:
+            offset = 0
+            while offset < min(len(text), len(previous)) and text[offset] == previous[offset]:
+                offset += 1
+
+        if offset == len(text) and not is_final:
+            return None
+
+        turn_key = raw_turn.get("turn_key", {})
+        return TurnDelta(
+            chat_id=turn_key.get("chat_id", ""),
+            turn_id=turn_key.get("turn_id", ""),
+            candidate_id=candidate_id,
+            text=text[offset:],
+            offset=offset,
+            is_final=is_final,
+            turn=turn,
+        )
+
+    async def __stream_turns(
+        self,
+        raw_turns: AsyncGenerator[Dict, Any],
+        stats: Optional[GenerationStats],
+        stream_mode: str,
+        options: Dict[str, Any],
+    ) -> AsyncGenerator[Union[Turn, TurnUpdate, TurnDelta], Any]:
+        # "turn" - Turn for every frame, "update" - TurnUpdate for every frame,
+        # "delta" - TurnDelta with the new text, "final" - only the final Turn.
+        # Turn is parsed only for the frames that need it.
+        #
+        # A frame updates one candidate or all of them at once, the generation is finished
+        # when num_candidates of them are final. With several candidates, Turn objects
+        # contain all of them, keyed by candidate_id, and "update"/"delta" modes yield
+        # one item for every candidate of the frame.
+        num_candidates = options.get("num_candidates", None) or 1
+
+        texts: Dict[str, str] = {}
+        candidates: Dict[str, Dict] = {}
+        finals: Set[str] = set()
+
+        coalesce_policy = options.get("coalesce_policy", None) or self.__requester.coalesce_policy
+        if coalesce_policy and stream_mode != "final":
+            raw_turns = coalesce_policy.coalesce(raw_turns)
+
+        try:
+            async for raw_turn in raw_turns:
+                raw_candidates = raw_turn.get("candidates")
+
+                for raw_candidate in raw_candidates:
+                    if raw_candidate.get("is_final", False):
+                        finals.add(raw_candidate.get("candidate_id", ""))
+
+                    if num_candidates > 1:
+                        candidates[raw_candidate.get("candidate_id", "")] = raw_candidate
+
+                is_finished = len(finals) >= num_candidates
+
+                whole_turn = raw_turn
+                if num_candidates > 1:
+                    whole_turn = {**raw_turn, "candidates": list(candidates.values())}
+
+                turn: Optional[Turn] = None
+                if is_finished or stream_mode == "turn":
+                    turn = Turn(whole_turn)
+
+                if is_finished:
+                    await self.__finish_generation_stats(turn, stats, **options)
+
+                if stream_mode == "update":
+                    if len(raw_candidates) == 1:
+                        yield TurnUpdate(raw_turn, turn)
+
+                    else:
+                        for raw_candidate in raw_candidates:
+                            yield TurnUpdate({**raw_turn, "candidates": [raw_candidate]}, turn)
+
+                elif stream_mode == "delta":
+                    for raw_candidate in raw_candidates:
+                        delta = self.__get_delta(raw_turn, raw_candidate, texts, turn)
+                        if delta is not None:
+                            yield delta
+
+                elif turn is not None:
+                    yield turn
+
+                if is_finished:
+                    break
+
+        finally:
+            await raw_turns.aclose()
+
+    def __make_generation_stream(
+        self, generator: AsyncGenerator, ws_message: Dict, chat_id: str, **kwargs: Any
+    ) -> GenerationStream:
+        request_id = ws_message["request_id"]
+        abort = kwargs.get("abort_on_cancel", None)
+
+        if abort is None:
+            abort = self.__requester.abort_on_cancel
+
+        def on_cancel() -> None:
+            if self.__requester.ws_cancel(request_id) and abort:
+                task = asyncio.ensure_future(self.__abort_generation(chat_id, request_id))
+                task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+        return GenerationStream(generator, request_id, on_cancel)
+
+    async def __abort_generation(self, chat_id: str, request_id: str) -> None:
+        ws_message = {
+            "command": "abort_generation",
+            "origin_id": "web-next",
+            "payload": {"chat_id": str(chat_id), "request_id": str(request_id)},
+            "request_id": str(uuid.uuid4()),
+        }
+
+        request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
+
+        try:
+            # only the first reply is awaited, it does not matter whether the server knows this command
+            await asyncio.wait_for(request.__anext__(), timeout=10.0)
+
+        finally:
+            await request.aclose()
+
     async def fetch_histories(self, character_id: str, amount: int = 50, **kwargs: Any) -> List[ChatHistory]:
         request = await self.__requester.request_async(
             url="https://plus.character.ai/chat/character/histories/",
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps({"external_id": character_id, "number": amount}),
+                "json": {"external_id": character_id, "number": amount},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "chat.fetch_histories",
             },
         )
 
@@ -51,6 +313,8 @@ class ChatMethods:
             url=f"https://neo.character.ai/chats/?character_ids={character_id}&num_preview_turns={num_preview_turns}",
             options={
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "chat.fetch_chats",
             },
         )
         
@@ -75,6 +339,9 @@ class ChatMethods:
             url=f"https://neo.character.ai/chat/{chat_id}/",
             options={
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "hedge": kwargs.get("hedge", True),
+                "operation": "chat.fetch_chat",
             },
         )
         
@@ -93,7 +360,11 @@ class ChatMethods:
     async def fetch_recent_chats(self, **kwargs: Any) -> List[Chat]:
         request = await self.__requester.request_async(
             url="https://neo.character.ai/chats/recent/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "chat.fetch_recent_chats",
+            },
         )
         
         response = request.json()
@@ -122,7 +393,12 @@ class ChatMethods:
 
         request = await self.__requester.request_async(
             url=url,
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "hedge": kwargs.get("hedge", True),
+                "operation": "chat.fetch_messages",
+            },
         )
         
         response = request.json()
@@ -204,7 +480,9 @@ class ChatMethods:
             options={
                 "method": "PATCH",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps({"name": name}),
+                "json": {"name": name},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "chat.update_chat_name",
             },
         )
         
@@ -225,6 +503,8 @@ class ChatMethods:
                 "method": "PATCH",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": {},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "chat.archive_chat",
             },
         )
 
@@ -244,6 +524,8 @@ class ChatMethods:
                 "method": "PATCH",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
                 "body": {},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "chat.unarchive_chat",
             },
         )
 
@@ -262,7 +544,9 @@ class ChatMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps({"end_turn_id": end_turn_id}),
+                "json": {"end_turn_id": end_turn_id},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "chat.copy_chat",
             },
         )
 
@@ -313,25 +597,29 @@ class ChatMethods:
         new_chat: Optional[Chat] = None
         greeting_turn: Optional[Turn] = None
 
-        async for raw_response in request:
-            if raw_response is None:
-                raise SessionClosedError
+        try:
+            async for raw_response in request:
+                if raw_response is None:
+                    raise SessionClosedError
 
-            if raw_response["command"] == "create_chat_response":
-                new_chat = Chat(raw_response.get("chat", None))
+                if raw_response["command"] == "create_chat_response":
+                    new_chat = Chat(raw_response.get("chat", None))
 
-                if greeting:
-                    continue
+                    if greeting:
+                        continue
 
-                break
+                    break
 
-            if raw_response["command"] == "add_turn":
-                greeting_turn = Turn(raw_response.get("turn", None))
-                break
+                if raw_response["command"] == "add_turn":
+                    greeting_turn = Turn(raw_response.get("turn", None))
+                    break
 
-            if raw_response["command"] == "neo_error":
-                error_comment = raw_response.get("comment", "")
-                raise CreateError(f"Cannot create a new chat. {error_comment}")
+                if raw_response["command"] == "neo_error":
+                    error_comment = raw_response.get("comment", "")
+                    raise CreateError(f"Cannot create a new chat. {error_comment}")
+
+        finally:
+            await request.aclose()
 
         if new_chat is None or (greeting is True and greeting_turn is None):
             raise CreateError("Cannot create a new chat.")
@@ -339,6 +627,8 @@ class ChatMethods:
         return new_chat, greeting_turn
 
     async def update_primary_candidate(self, chat_id: str, turn_id, candidate_id: str, **kwargs: Any) -> bool:
+        request_id = str(uuid.uuid4())
+
         ws_message = {
             "command": "update_primary_candidate",
             "origin_id": "web-next",
@@ -346,26 +636,54 @@ class ChatMethods:
                 "candidate_id": str(candidate_id),
                 "turn_key": {"chat_id": str(chat_id), "turn_id": str(turn_id)},
             },
+            "request_id": str(request_id),
         }
 
         request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
 
-        async for raw_response in request:
-            if raw_response is None:
-                raise SessionClosedError
+        try:
+            async for raw_response in request:
+                if raw_response is None:
+                    raise SessionClosedError
 
-            if raw_response["command"] == "neo_error":
-                error_comment = raw_response.get("comment", "")
-                raise UpdateError(f"Cannot update primary candidate. {error_comment}")
+                if raw_response["command"] == "neo_error":
+                    error_comment = raw_response.get("comment", "")
+                    raise UpdateError(f"Cannot update primary candidate. {error_comment}")
+
+                if raw_response["command"] == "ok":
+                    return True
 
-            if raw_response["command"] == "ok":
-                return True
+        finally:
+            await request.aclose()
 
         return False
 
+    async def select_best_candidate(
+        self, turn: Turn, score: Optional[Callable[[TurnCandidate], float]] = None, **kwargs: Any
+    ) -> TurnCandidate:
+        # e.g. after send_message(..., num_candidates=4). Filtered candidates are picked
+        # only if there is nothing else, the longest text wins by default.
+        candidates = [candidate for candidate in turn.get_candidates() if not candidate.is_filtered]
+        candidates = candidates or turn.get_candidates()
+
+        if not candidates:
+            raise UpdateError("Cannot select best candidate. Turn has no candidates.")
+
+        best = max(candidates, key=score or (lambda candidate: len(candidate.text)))
+
+        if best.candidate_id != turn.primary_candidate_id:
+            if not await self.update_primary_candidate(turn.chat_id, turn.turn_id, best.candidate_id, **kwargs):
+                raise UpdateError("Cannot select best candidate. Primary candidate was not updated.")
+
+            turn.primary_candidate_id = best.candidate_id
+
+        return best
+
     async def send_message(
         self, character_id: str, chat_id: str, text: str, streaming: bool = False, **kwargs: Any
-    ) -> Union[Turn, AsyncGenerator[Turn, Any]]:
+    ) -> Union[Turn, GenerationStream]:
+        num_candidates = self.__get_num_candidates(**kwargs)
+
         candidate_id = str(uuid.uuid4())
         turn_id = str(uuid.uuid4())
         request_id = str(uuid.uuid4())
@@ -375,7 +693,7 @@ class ChatMethods:
             "origin_id": "web-next",
             "payload": {
                 "character_id": str(character_id),
-                "num_candidates": 1,
+                "num_candidates": num_candidates,
                 "previous_annotations": {
                     "bad_memory": 0,
                     "boring": 0,
@@ -417,51 +735,75 @@ class ChatMethods:
             "request_id": str(request_id),
         }
 
-        request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
+        stream_mode = self.__get_stream_mode(**kwargs)
+        timeouts = self.__requester.get_generation_timeouts(**kwargs)
+        stats = self.__new_generation_stats(ws_message, character_id, chat_id, **kwargs)
+
+        request = self.__receive_with_deadlines(
+            self.__requester.ws_send_and_receive_async(
+                ws_message,
+                token=self.__client.get_token(),
+                connect_timeout=timeouts["connect_timeout"],
+                stats=stats,
+            ),
+            timeouts,
+            stats,
+        )
 
-        async def responses() -> AsyncGenerator[Turn, Any]:
-            async for raw_response in request:
-                if raw_response is None:
-                    raise SessionClosedError
+        async def raw_turns() -> AsyncGenerator[Dict, Any]:
+            try:
+                async for raw_response in request:
+                    if raw_response is None:
+                        raise SessionClosedError
                 
-                command = raw_response.get("command", None)
-                if not command:
-                    raise ActionError("Cannot send message.")
+                    command = raw_response.get("command", None)
+                    if not command:
+                        raise ActionError("Cannot send message.")
 
-                if command == "neo_error":
-                    error_comment = raw_response.get("comment", "")
-                    raise ActionError(f"Cannot send message. {error_comment}")
+                    if command == "neo_error":
+                        error_comment = raw_response.get("comment", "")
+                        raise ActionError(f"Cannot send message. {error_comment}")
 
-                elif command in ["add_turn", "update_turn"]:
-                    # Skip first response
-                    if raw_response["turn"].get("author", {}).get("is_human", False):
-                        continue
+                    elif command in ["add_turn", "update_turn"]:
+                        # Skip first response
+                        if raw_response["turn"].get("author", {}).get("is_human", False):
+                            continue
 
-                    yield Turn(raw_response["turn"])
+                        yield raw_response["turn"]
 
-                    if raw_response["turn"].get("candidates")[0].get("is_final", False):
-                        break
+                    elif command == "filter_user_input_self_harm":
+                        raise ActionError("Cannot send message. Self harm message detected")
 
-                elif command == "filter_user_input_self_harm":
-                    raise ActionError("Cannot send message. Self harm message detected")
+                    else:
+                        continue
 
-                else:
-                    continue
+            finally:
+                await request.aclose()
 
         if streaming:
-            return responses()
+            return self.__make_generation_stream(
+                self.__stream_turns(raw_turns(), stats, stream_mode, kwargs), ws_message, chat_id, **kwargs
+            )
 
         # else
-        async for response in responses():
-            primary_candidate = response.get_primary_candidate()
-            if primary_candidate and primary_candidate.is_final:
-                return response
+        responses = self.__stream_turns(raw_turns(), stats, "final", kwargs)
+
+        try:
+            async for response in responses:
+                primary_candidate = response.get_primary_candidate()
+                if primary_candidate and primary_candidate.is_final:
+                    return response
+
+        finally:
+            await responses.aclose()
 
         raise ActionError("Cannot send message.")
 
     async def another_response(
         self, character_id: str, chat_id: str, turn_id: str, streaming: bool = False, **kwargs: Any
-    ) -> Union[Turn, AsyncGenerator[Turn, Any]]:
+    ) -> Union[Turn, GenerationStream]:
+        num_candidates = self.__get_num_candidates(**kwargs)
+
         request_id = str(uuid.uuid4())
 
         ws_message = {
@@ -501,34 +843,190 @@ class ChatMethods:
             "request_id": str(request_id),
         }
 
-        request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
+        if num_candidates > 1:
+            ws_message["payload"]["num_candidates"] = num_candidates
+
+        stream_mode = self.__get_stream_mode(**kwargs)
+        timeouts = self.__requester.get_generation_timeouts(**kwargs)
+        stats = self.__new_generation_stats(ws_message, character_id, chat_id, **kwargs)
+
+        request = self.__receive_with_deadlines(
+            self.__requester.ws_send_and_receive_async(
+                ws_message,
+                token=self.__client.get_token(),
+                connect_timeout=timeouts["connect_timeout"],
+                stats=stats,
+            ),
+            timeouts,
+            stats,
+        )
 
-        async def responses() -> AsyncGenerator[Turn, Any]:
-            async for raw_response in request:
-                if raw_response is None:
-                    raise SessionClosedError
+        async def raw_turns() -> AsyncGenerator[Dict, Any]:
+            try:
+                async for raw_response in request:
+                    if raw_response is None:
+                        raise SessionClosedError
 
-                if raw_response["command"] == "neo_error":
-                    error_comment = raw_response.get("comment", "")
-                    raise ActionError(f"Cannot generate another response. {error_comment}")
+                    if raw_response["command"] == "neo_error":
+                        error_comment = raw_response.get("comment", "")
+                        raise ActionError(f"Cannot generate another response. {error_comment}")
 
-                if raw_response["command"] == "update_turn":
-                    yield Turn(raw_response["turn"])
+                    if raw_response["command"] == "update_turn":
+                        yield raw_response["turn"]
 
-                    if raw_response["turn"].get("candidates")[0].get("is_final", False):
-                        break
+            finally:
+                await request.aclose()
 
         if streaming:
-            return responses()
+            return self.__make_generation_stream(
+                self.__stream_turns(raw_turns(), stats, stream_mode, kwargs), ws_message, chat_id, **kwargs
+            )
 
         # else
-        async for response in responses():
-            primary_candidate = response.get_primary_candidate()
-            if primary_candidate and primary_candidate.is_final:
-                return response
+        responses = self.__stream_turns(raw_turns(), stats, "final", kwargs)
+
+        try:
+            async for response in responses:
+                primary_candidate = response.get_primary_candidate()
+                if primary_candidate and primary_candidate.is_final:
+                    return response
+
+        finally:
+            await responses.aclose()
 
         raise ActionError("Cannot generate another response.")
 
+    async def send_messages_many(
+        self,
+        jobs: Iterable[Union[MessageJob, Tuple[str, str, str]]],
+        concurrency: int = 8,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[MessageResult, None]:
+        # Jobs are taken lazily by "concurrency" workers, results are yielded as soon as they
+        # are ready (not in the order of the jobs). A failed job does not stop the others.
+        # Closing the generator (or cancelling the task iterating it) cancels every job left.
+        if concurrency < 1:
+            raise InvalidArgumentError(f"Invalid concurrency: {concurrency}")
+
+        pending = enumerate(jobs)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def run(index: int, job: MessageJob) -> MessageResult:
+            start = time.monotonic()
+            error: Optional[BaseException] = None
+
+            try:
+                turn = await asyncio.wait_for(
+                    self.send_message(job.character_id, job.chat_id, job.text, **{**kwargs, **job.options}),
+                    timeout=timeout,
+                )
+                return MessageResult(job, index, turn=turn, elapsed=time.monotonic() - start)
+
+            except asyncio.TimeoutError:
+                error = GenerationTimeoutError(f"Message was not answered in {timeout} seconds.")
+
+            except Exception as exception:
+                error = exception
+
+            return MessageResult(job, index, error=error, elapsed=time.monotonic() - start)
+
+        async def worker() -> None:
+            try:
+                for index, value in pending:
+                    results.put_nowait(await run(index, MessageJob.from_value(value)))
+
+            except Exception as error:
+                # invalid job or a failing iterable
+                results.put_nowait(error)
+
+            finally:
+                results.put_nowait(None)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+        finished = 0
+
+        try:
+            while finished < len(workers):
+                result = await results.get()
+
+                if result is None:
+                    finished += 1
+
+                elif isinstance(result, Exception):
+                    raise result
+
+                else:
+                    yield result
+
+        finally:
+            for task in workers:
+                task.cancel()
+
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def fan_out(
+        self,
+        character_ids: Iterable[str],
+        text: str,
+        chats: Optional[Dict[str, str]] = None,
+        concurrency: int = 8,
+        timeout: Optional[float] = None,
+        greeting: bool = False,
+        **kwargs: Any,
+    ) -> FanOutReport:
+        # Sends the same message to every character, in a new chat unless one is supplied
+        # in "chats" (character_id: chat_id). Every character goes through its own setup
+        # and generation, so they overlap and the whole run takes about as long as the slowest one.
+        if concurrency < 1:
+            raise InvalidArgumentError(f"Invalid concurrency: {concurrency}")
+
+        chats = chats or {}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(result: FanOutResult) -> None:
+            start = time.monotonic()
+            result.stage = "setup"
+
+            result.chat_id = chats.get(result.character_id, None)
+            if result.chat_id is None:
+                chat, _ = await self.create_chat(result.character_id, greeting=greeting, **kwargs)
+                result.chat_id = chat.chat_id
+                result.setup_time = time.monotonic() - start
+
+            result.stage = "generation"
+            generation_start = time.monotonic()
+
+            result.turn = await self.send_message(
+                result.character_id, result.chat_id, text, **{**kwargs, "generation_stats": True}
+            )
+            result.generation_stats = result.turn.generation_stats
+            result.generation_time = time.monotonic() - generation_start
+
+            result.stage = None
+
+        async def guarded(result: FanOutResult) -> None:
+            async with semaphore:
+                start = time.monotonic()
+
+                try:
+                    await asyncio.wait_for(run(result), timeout=timeout)
+
+                except asyncio.TimeoutError:
+                    result.error = GenerationTimeoutError(f"Character did not answer in {timeout} seconds.")
+
+                except Exception as error:
+                    result.error = error
+
+                result.elapsed = time.monotonic() - start
+
+        results = [FanOutResult(character_id, index) for index, character_id in enumerate(character_ids)]
+
+        start = time.monotonic()
+        await asyncio.gather(*[guarded(result) for result in results])
+
+        return FanOutReport(results, time.monotonic() - start)
+
     async def edit_message(self, chat_id: str, turn_id: str, candidate_id: str, text: str, **kwargs: Any) -> Turn:
         request_id = str(uuid.uuid4())
 
@@ -545,18 +1043,22 @@ class ChatMethods:
 
         request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
 
-        async for raw_response in request:
-            if raw_response is None:
-                raise SessionClosedError
+        try:
+            async for raw_response in request:
+                if raw_response is None:
+                    raise SessionClosedError
+
+                if raw_response["command"] == "neo_error":
+                    error_comment = raw_response.get("comment", "")
+                    raise EditError(f"Cannot edit message. {error_comment}")
 
-            if raw_response["command"] == "neo_error":
-                error_comment = raw_response.get("comment", "")
-                raise EditError(f"Cannot edit message. {error_comment}")
+                if raw_response["command"] == "update_turn":
+                    return Turn(raw_response["turn"])
 
-            if raw_response["command"] == "update_turn":
-                return Turn(raw_response["turn"])
+                break
 
-            break
+        finally:
+            await request.aclose()
 
         raise EditError("Cannot edit message.")
 
@@ -566,9 +1068,11 @@ class ChatMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps({
+                "json": {
                     "turn_ids": turn_ids
-                })
+                },
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "chat.delete_messages",
             }
         )
         
@@ -600,18 +1104,22 @@ class ChatMethods:
 
         request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
 
-        async for raw_response in request:
-            if raw_response is None:
-                raise SessionClosedError
+        try:
+            async for raw_response in request:
+                if raw_response is None:
+                    raise SessionClosedError
 
-            if raw_response["command"] == "neo_error":
-                error_comment = raw_response.get("comment", "")
-                raise ActionError(f"Cannot pin message. {error_comment}")
+                if raw_response["command"] == "neo_error":
+                    error_comment = raw_response.get("comment", "")
+                    raise ActionError(f"Cannot pin message. {error_comment}")
 
-            if raw_response["command"] == "update_turn":
-                return raw_response["turn"].get("is_pinned", False) is True
+                if raw_response["command"] == "update_turn":
+                    return raw_response["turn"].get("is_pinned", False) is True
 
-            break
+                break
+
+        finally:
+            await request.aclose()
 
         raise ActionError("Cannot pin message.")
 
@@ -630,17 +1138,21 @@ class ChatMethods:
 
         request = self.__requester.ws_send_and_receive_async(ws_message, token=self.__client.get_token())
 
-        async for raw_response in request:
-            if raw_response is None:
-                raise SessionClosedError
+        try:
+            async for raw_response in request:
+                if raw_response is None:
+                    raise SessionClosedError
 
-            if raw_response["command"] == "neo_error":
-                error_comment = raw_response.get("comment", "")
-                raise ActionError(f"Cannot unpin message. {error_comment}")
+                if raw_response["command"] == "neo_error":
+                    error_comment = raw_response.get("comment", "")
+                    raise ActionError(f"Cannot unpin message. {error_comment}")
+
+                if raw_response["command"] == "update_turn":
+                    return raw_response["turn"].get("is_pinned", False) is False
 
-            if raw_response["command"] == "update_turn":
-                return raw_response["turn"].get("is_pinned", False) is False
+                break
 
-            break
+        finally:
+            await request.aclose()
 
         raise ActionError("Cannot unpin message.")
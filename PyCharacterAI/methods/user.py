@@ -1,10 +1,10 @@
-import json
 from typing import Optional, List, Any
 
 from ..types import PublicUser, Voice
 from ..exceptions import FetchError, ActionError
 
 from ..requester import Requester
+from ..retry import DEFAULT_RETRY_POLICY
 
 
 class UserMethods:
@@ -18,7 +18,10 @@ class UserMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps({"username": username}),
+                "json": {"username": username},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "single_flight": True,
+                "operation": "user.fetch_user",
             },
         )
 
@@ -33,7 +36,11 @@ class UserMethods:
     async def fetch_user_voices(self, username: str, **kwargs: Any) -> List[Voice]:
         request = await self.__requester.request_async(
             url=f"https://neo.character.ai/multimodal/api/v1/voices/search?creatorInfo.username={username}",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "user.fetch_user_voices",
+            },
         )
         
         response = request.json()
@@ -57,7 +64,9 @@ class UserMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps({"username": username}),
+                "json": {"username": username},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "user.follow_user",
             },
         )
 
@@ -73,7 +82,9 @@ class UserMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps({"username": username}),
+                "json": {"username": username},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "user.unfollow_user",
             },
         )
 
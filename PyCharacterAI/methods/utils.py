@@ -1,10 +1,9 @@
 import os
-import json
 import base64
 import mimetypes
 
 from random import randint
-from typing import Any, List, Optional, Union
+from typing import Any, BinaryIO, List, Optional, Union
 from urllib.parse import urlparse, quote
 
 from ..types import Avatar, Voice
@@ -18,7 +17,8 @@ from ..exceptions import (
     DeleteError,
 )
 
-from ..requester import Requester
+from ..requester import Requester, StreamResponse
+from ..retry import DEFAULT_RETRY_POLICY
 
 
 class UtilsMethods:
@@ -29,7 +29,11 @@ class UtilsMethods:
     async def ping(self, **kwargs: Any) -> bool:
         request = await self.__requester.request_async(
             url="https://neo.character.ai/ping/",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "utils.ping",
+            },
         )
 
         return request.status_code == 200
@@ -37,7 +41,11 @@ class UtilsMethods:
     async def fetch_voice(self, voice_id, **kwargs: Any) -> Voice:
         request = await self.__requester.request_async(
             url=f"https://neo.character.ai/multimodal/api/v1/voices/{voice_id}",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "utils.fetch_voice",
+            },
         )
 
         if request.status_code == 200:
@@ -48,7 +56,11 @@ class UtilsMethods:
     async def search_voices(self, voice_name: str, **kwargs: Any) -> List[Voice]:
         request = await self.__requester.request_async(
             url=f"https://neo.character.ai/multimodal/api/v1/voices/search?query={quote(voice_name)}",
-            options={"headers": self.__client.get_headers(kwargs.get("token", None))},
+            options={
+                "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "utils.search_voices",
+            },
         )
 
         if request.status_code == 200:
@@ -65,13 +77,13 @@ class UtilsMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps(
-                    {
-                        "prompt": prompt,
-                        "num_candidates": num_candidates,
-                        "model_version": "v1",
-                    }
-                ),
+                "json": {
+                    "prompt": prompt,
+                    "num_candidates": num_candidates,
+                    "model_version": "v1",
+                },
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "utils.generate_image",
             },
         )
 
@@ -98,8 +110,27 @@ class UtilsMethods:
         else:
             parsed_url = urlparse(image)
             if parsed_url.scheme and parsed_url.netloc:
-                image_request = await self.__requester.request_async(image)
-                data = base64.b64encode(image_request.content)
+                image_request = await self.__requester.stream_async(
+                    url=image,
+                    options={
+                        "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                        "operation": "utils.upload_avatar",
+                    },
+                )
+
+                # encoding while downloading, so the raw image is never fully in memory
+                # (the base64 text still is, it is sent as a part of the json body)
+                data = bytearray()
+                remainder = b""
+
+                async for chunk in image_request.iter_content():
+                    chunk = remainder + chunk
+                    size = len(chunk) - len(chunk) % 3
+
+                    data += base64.b64encode(chunk[:size])
+                    remainder = chunk[size:]
+
+                data += base64.b64encode(remainder)
 
             else:
                 raise InvalidArgumentError("Cannot upload avatar. Invalid image.")
@@ -116,7 +147,9 @@ class UtilsMethods:
                     web_next_auth=kwargs.get("web_next_auth", None),
                     include_web_next_auth=True,
                 ),
-                "body": json.dumps({"0": {"json": {"imageDataUrl": image_url}}}),
+                "json": {"0": {"json": {"imageDataUrl": image_url}}},
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "utils.upload_avatar",
             },
         )
 
@@ -128,7 +161,13 @@ class UtilsMethods:
                 avatar = Avatar({"file_name": file_name})
 
                 if check_image:
-                    image_request = await self.__requester.request_async(avatar.get_url())
+                    image_request = await self.__requester.request_async(
+                        url=avatar.get_url(),
+                        options={
+                            "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                            "operation": "utils.upload_avatar",
+                        },
+                    )
 
                     if image_request.status_code != 200:
                         raise UploadError(f"Cannot upload avatar. {image_request.text}")
@@ -154,38 +193,48 @@ class UtilsMethods:
             raise InvalidArgumentError('Cannot upload voice. Visibility must be "public" or "private"')
 
         mime = "audio/mpeg"
+        voice_url: Optional[str] = None
 
-        if isinstance(voice, bytes):
-            data = voice
-
-        elif os.path.isfile(voice):
-            with open(voice, "rb") as voice_file:
-                data = voice_file.read()
-
-        else:
+        if not isinstance(voice, bytes) and not os.path.isfile(voice):
             parsed_url = urlparse(voice)
-            if parsed_url.scheme and parsed_url.netloc:
-                voice_request = await self.__requester.request_async(voice)
-                data = voice_request.content
-
-                mime, _ = mimetypes.guess_type(voice)
-
-            else:
+            if not parsed_url.scheme or not parsed_url.netloc:
                 raise InvalidArgumentError("Cannot upload voice. Invalid audio.")
 
+            voice_url = voice
+            mime, _ = mimetypes.guess_type(voice)
+
         # sequence of 30 random numbers
         boundary_numbers = "".join(["{}".format(randint(0, 9)) for _ in range(0, 30)])
 
         boundary = f"---------------------------{boundary_numbers}"
 
         # First part
-        body = (
+        body = bytearray((
             f"--{boundary}\r\n"
             f'Content-Disposition: form-data; name="file"; filename="input.mp3"\r\n'
             f"Content-Type: {mime}\r\n\r\n"
-        ).encode("UTF-8")
+        ).encode("UTF-8"))
+
+        # the whole multipart body is kept in memory, a remote clip is only downloaded in chunks
+        if isinstance(voice, bytes):
+            body += voice
+
+        elif voice_url is None:
+            with open(voice, "rb") as voice_file:
+                body += voice_file.read()
+
+        else:
+            voice_request = await self.__requester.stream_async(
+                url=voice_url,
+                options={
+                    "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                    "operation": "utils.upload_voice",
+                },
+            )
+
+            async for chunk in voice_request.iter_content():
+                body += chunk
 
-        body += data
         body += f"\r\n--{boundary}\r\n".encode("UTF-8")
 
         # Second part
@@ -210,7 +259,9 @@ class UtilsMethods:
                     "Content-Type": f"multipart/form-data; boundary={boundary}",
                     "authorization": f"Token {kwargs.get('token') or self.__client.get_token()}",
                 },
-                "body": body,
+                "body": bytes(body),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "utils.upload_voice",
             },
         )
         
@@ -272,29 +323,29 @@ class UtilsMethods:
             options={
                 "method": "PUT",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps(
-                    {
-                        "voice": {
-                            "audioSourceType": "file",
-                            "backendId": voice.voice_id,
-                            "backendProvider": "cai",
-                            "creatorInfo": {
-                                "id": voice.creator_id,
-                                "source": "user",
-                                "username": "",
-                            },
-                            "description": voice.description,
-                            "gender": voice.gender,
-                            "id": voice.voice_id,
-                            "internalStatus": "draft",
-                            "lastUpdateTime": "0001-01-01T00:00:00Z",
-                            "name": name,
-                            "previewAudioURI": voice.preview_audio_url,
-                            "previewText": voice.preview_text,
-                            "visibility": visibility,
-                        }
+                "json": {
+                    "voice": {
+                        "audioSourceType": "file",
+                        "backendId": voice.voice_id,
+                        "backendProvider": "cai",
+                        "creatorInfo": {
+                            "id": voice.creator_id,
+                            "source": "user",
+                            "username": "",
+                        },
+                        "description": voice.description,
+                        "gender": voice.gender,
+                        "id": voice.voice_id,
+                        "internalStatus": "draft",
+                        "lastUpdateTime": "0001-01-01T00:00:00Z",
+                        "name": name,
+                        "previewAudioURI": voice.preview_audio_url,
+                        "previewText": voice.preview_text,
+                        "visibility": visibility,
                     }
-                ),
+                },
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "utils.edit_voice",
             },
         )
 
@@ -315,6 +366,8 @@ class UtilsMethods:
             options={
                 "method": "DELETE",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "utils.delete_voice",
             },
         )
         
@@ -330,7 +383,7 @@ class UtilsMethods:
 
     async def generate_speech(
         self, chat_id: str, turn_id: str, candidate_id: str, voice_id: str, **kwargs: Any
-    ) -> Union[bytes, str]:
+    ) -> Union[bytes, str, int, StreamResponse]:
         return_url = kwargs.get("return_url", False)
 
         request = await self.__requester.request_async(
@@ -338,14 +391,14 @@ class UtilsMethods:
             options={
                 "method": "POST",
                 "headers": self.__client.get_headers(kwargs.get("token", None)),
-                "body": json.dumps(
-                    {
-                        "candidateId": candidate_id,
-                        "roomId": chat_id,
-                        "turnId": turn_id,
-                        "voiceId": voice_id,
-                    }
-                ),
+                "json": {
+                    "candidateId": candidate_id,
+                    "roomId": chat_id,
+                    "turnId": turn_id,
+                    "voiceId": voice_id,
+                },
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "utils.generate_speech",
             },
         )
 
@@ -367,11 +420,40 @@ class UtilsMethods:
         if return_url:
             return audio_url
 
-        request = await self.__requester.request_async(url=audio_url, options={})
+        stream: bool = kwargs.get("stream", False)
+        sink: Optional[Union[str, BinaryIO]] = kwargs.get("sink", None)
+
+        if not stream and sink is None:
+            request = await self.__requester.request_async(
+                url=audio_url,
+                options={
+                    "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                    "operation": "utils.generate_speech",
+                },
+            )
 
-        speech = request.content
+            speech = request.content
 
-        if request.status_code == 200:
-            return speech
+            if request.status_code == 200:
+                return speech
+
+            raise ActionError("Cannot generate speech.")
+
+        # Audio is received in chunks, so it can be relayed before the download is finished
+        audio = await self.__requester.stream_async(
+            url=audio_url,
+            options={
+                "retry_policy": kwargs.get("retry_policy", DEFAULT_RETRY_POLICY),
+                "operation": "utils.generate_speech",
+            },
+        )
+
+        if audio.status_code != 200:
+            await audio.close()
+            raise ActionError("Cannot generate speech.")
+
+        if sink is not None:
+            return await audio.save(sink)
 
-        raise ActionError("Cannot generate speech.")
+        # the caller reads the audio (iter_content, read or save) or releases it with close()
+        return audio
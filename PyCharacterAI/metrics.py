@@ -0,0 +1,302 @@
+import bisect
+import asyncio
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .hooks import Event, Hooks
+from .stats import GenerationStats
+
+
+class Histogram:
+    # Counts of observations per bucket (upper bounds in seconds), recording is O(log buckets)
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, buckets: Optional[Sequence[float]] = None):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets or self.BUCKETS))
+
+        # the last one counts everything above the largest bucket
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        # upper bound of the bucket the quantile falls into
+        if not self.count:
+            return None
+
+        rank = quantile * self.count
+        total = 0
+
+        for index, count in enumerate(self.counts):
+            total += count
+            if total >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+
+        return float("inf")
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        result = []
+        total = 0
+
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": dict(self.cumulative()),
+        }
+
+
+class MetricsRegistry:
+    # Metrics collected from request lifecycle events (see Hooks).
+    #
+    # HTTP requests are grouped by the client method that made them (e.g. "chat.fetch_messages"),
+    # websocket streams by their command (e.g. "create_and_generate_turn").
+    # One registry can be shared by several clients: Client(metrics=registry).
+
+    def __init__(self, buckets: Optional[Sequence[float]] = None, prefix: str = "pycharacterai"):
+        self.buckets: Optional[Sequence[float]] = buckets
+        self.prefix: str = prefix
+
+        self.request_duration: Dict[str, Histogram] = {}
+        self.responses: Dict[Tuple[str, int], int] = {}
+        self.request_errors: Dict[Tuple[str, str], int] = {}
+        self.request_retries: Dict[str, int] = {}
+        self.bytes_sent: Dict[str, int] = {}
+        self.bytes_received: Dict[str, int] = {}
+
+        self.requests_in_flight: int = 0
+
+        self.ws_frames: Dict[str, int] = {}
+        self.ws_stream_duration: Dict[str, Histogram] = {}
+        self.ws_stream_errors: Dict[Tuple[str, str], int] = {}
+        self.ws_connects: int = 0
+        self.ws_disconnects: int = 0
+
+        self.generation_first_frame: Dict[str, Histogram] = {}
+        self.generation_duration: Dict[str, Histogram] = {}
+        self.generation_chars: Dict[str, int] = {}
+
+        self.__gauges: Dict[str, List[Callable[[], float]]] = {}
+
+        self.__handlers: Dict[str, Callable[[Event], None]] = {
+            "request_start": self.__on_request_start,
+            "request_retry": self.__on_request_retry,
+            "request_error": self.__on_request_error,
+            "request_body": self.__on_request_body,
+            "ws_connect": self.__on_ws_connect,
+            "ws_frame": self.__on_ws_frame,
+            "ws_stream_end": self.__on_ws_stream_end,
+            "ws_close": self.__on_ws_close,
+        }
+
+    def attach(self, hooks: Hooks) -> None:
+        for name, handler in self.__handlers.items():
+            hooks.on(name, handler)
+
+    def detach(self, hooks: Hooks) -> None:
+        for name, handler in self.__handlers.items():
+            hooks.off(name, handler)
+
+    def add_gauge(self, name: str, callback: Callable[[], float]) -> None:
+        # values of gauges with the same name (e.g. from several clients) are summed
+        self.__gauges.setdefault(name, []).append(callback)
+
+    def remove_gauge(self, name: str, callback: Callable[[], float]) -> None:
+        callbacks = self.__gauges.get(name, [])
+
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def get_gauges(self) -> Dict[str, float]:
+        gauges: Dict[str, float] = {"requests_in_flight": self.requests_in_flight}
+
+        for name, callbacks in self.__gauges.items():
+            gauges[name] = sum(callback() for callback in callbacks)
+
+        return gauges
+
+    def reset(self) -> None:
+        for metric in [
+            self.request_duration, self.responses, self.request_errors, self.request_retries,
+            self.bytes_sent, self.bytes_received, self.ws_frames, self.ws_stream_duration, self.ws_stream_errors,
+            self.generation_first_frame, self.generation_duration, self.generation_chars,
+        ]:
+            metric.clear()
+
+        self.ws_connects = 0
+        self.ws_disconnects = 0
+
+    def record_generation(self, stats: GenerationStats) -> None:
+        if stats.time_to_first_frame is not None:
+            self.__observe(self.generation_first_frame, stats.command, stats.time_to_first_frame)
+
+        if stats.time_to_final is not None:
+            self.__observe(self.generation_duration, stats.command, stats.time_to_final)
+
+        self.__increment(self.generation_chars, stats.command, stats.chars)
+
+    # ================================================================== #
+    #                               Events                               #
+    # ================================================================== #
+
+    @staticmethod
+    def __get_key(event: Event) -> str:
+        return event.operation or f"{event.method} {event.endpoint}"
+
+    def __observe(self, histograms: Dict[str, Histogram], key: str, value: float) -> None:
+        histogram = histograms.get(key, None)
+        if histogram is None:
+            histogram = Histogram(self.buckets)
+            histograms[key] = histogram
+
+        histogram.observe(value)
+
+    @staticmethod
+    def __increment(counters: Dict, key, value: int = 1) -> None:
+        counters[key] = counters.get(key, 0) + value
+
+    def __on_request_start(self, event: Event) -> None:
+        self.requests_in_flight += 1
+        self.__increment(self.bytes_sent, self.__get_key(event), event.bytes_sent)
+
+    def __on_request_retry(self, event: Event) -> None:
+        self.requests_in_flight -= 1
+        self.__increment(self.request_retries, self.__get_key(event))
+
+    def __on_request_error(self, event: Event) -> None:
+        self.requests_in_flight -= 1
+
+        # hedge losers and requests nobody waits for anymore are cancelled on purpose
+        if not isinstance(event.error, asyncio.CancelledError):
+            self.__increment(self.request_errors, (self.__get_key(event), type(event.error).__name__))
+
+    def __on_request_body(self, event: Event) -> None:
+        key = self.__get_key(event)
+
+        self.requests_in_flight -= 1
+        self.__observe(self.request_duration, key, event.elapsed)
+        self.__increment(self.responses, (key, event.status_code or 0))
+        self.__increment(self.bytes_received, key, event.bytes_received)
+
+    def __on_ws_connect(self, event: Event) -> None:
+        self.ws_connects += 1
+
+    def __on_ws_close(self, event: Event) -> None:
+        self.ws_disconnects += 1
+
+    def __on_ws_frame(self, event: Event) -> None:
+        self.__increment(self.ws_frames, event.endpoint)
+
+    def __on_ws_stream_end(self, event: Event) -> None:
+        self.__observe(self.ws_stream_duration, event.endpoint, event.elapsed)
+
+        if event.error is not None:
+            self.__increment(self.ws_stream_errors, (event.endpoint, type(event.error).__name__))
+
+    # ================================================================== #
+    #                               Export                               #
+    # ================================================================== #
+
+    def to_dict(self) -> Dict:
+        return {
+            "requests": {
+                key: {
+                    "duration": histogram.to_dict(),
+                    "statuses": {status: count for (name, status), count in self.responses.items() if name == key},
+                }
+                for key, histogram in self.request_duration.items()
+            },
+            "request_errors": {f"{key} {error}": count for (key, error), count in self.request_errors.items()},
+            "request_retries": dict(self.request_retries),
+            "bytes_sent": dict(self.bytes_sent),
+            "bytes_received": dict(self.bytes_received),
+            "ws_frames": dict(self.ws_frames),
+            "ws_streams": {key: histogram.to_dict() for key, histogram in self.ws_stream_duration.items()},
+            "ws_stream_errors": {f"{key} {error}": count for (key, error), count in self.ws_stream_errors.items()},
+            "ws_connects": self.ws_connects,
+            "ws_disconnects": self.ws_disconnects,
+            "generations": {
+                key: {
+                    "first_frame": histogram.to_dict(),
+                    "duration": self.generation_duration[key].to_dict() if key in self.generation_duration else None,
+                    "chars": self.generation_chars.get(key, 0),
+                }
+                for key, histogram in self.generation_first_frame.items()
+            },
+            "gauges": self.get_gauges(),
+        }
+
+    @staticmethod
+    def __escape(value: object) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    @classmethod
+    def __labels(cls, **labels: object) -> str:
+        return "{" + ",".join(f'{key}="{cls.__escape(value)}"' for key, value in labels.items()) + "}"
+
+    def __histogram_lines(self, name: str, label: str, histograms: Dict[str, Histogram]) -> List[str]:
+        lines = [f"# TYPE {name} histogram"]
+
+        for key, histogram in histograms.items():
+            for bound, count in histogram.cumulative():
+                lines.append(f"{name}_bucket{self.__labels(**{label: key, 'le': bound})} {count}")
+
+            lines.append(f"{name}_sum{self.__labels(**{label: key})} {histogram.sum}")
+            lines.append(f"{name}_count{self.__labels(**{label: key})} {histogram.count}")
+
+        return lines
+
+    def __counter_lines(self, name: str, counters: Dict, labels: Sequence[str]) -> List[str]:
+        lines = [f"# TYPE {name} counter"]
+
+        for key, count in counters.items():
+            values = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{name}{self.__labels(**dict(zip(labels, values)))} {count}")
+
+        return lines
+
+    def to_prometheus(self) -> str:
+        # text exposition format
+        prefix = self.prefix
+        lines: List[str] = []
+
+        lines += self.__histogram_lines(f"{prefix}_request_duration_seconds", "endpoint", self.request_duration)
+        lines += self.__counter_lines(f"{prefix}_responses_total", self.responses, ["endpoint", "status"])
+        lines += self.__counter_lines(f"{prefix}_request_errors_total", self.request_errors, ["endpoint", "error"])
+        lines += self.__counter_lines(f"{prefix}_request_retries_total", self.request_retries, ["endpoint"])
+        lines += self.__counter_lines(f"{prefix}_request_sent_bytes_total", self.bytes_sent, ["endpoint"])
+        lines += self.__counter_lines(f"{prefix}_response_received_bytes_total", self.bytes_received, ["endpoint"])
+
+        lines += self.__counter_lines(f"{prefix}_ws_frames_total", self.ws_frames, ["command"])
+        lines += self.__histogram_lines(f"{prefix}_ws_stream_duration_seconds", "command", self.ws_stream_duration)
+        lines += self.__counter_lines(f"{prefix}_ws_stream_errors_total", self.ws_stream_errors, ["command", "error"])
+
+        lines += [f"# TYPE {prefix}_ws_connects_total counter", f"{prefix}_ws_connects_total {self.ws_connects}"]
+        lines += [f"# TYPE {prefix}_ws_disconnects_total counter", f"{prefix}_ws_disconnects_total {self.ws_disconnects}"]
+
+        lines += self.__histogram_lines(
+            f"{prefix}_generation_first_frame_seconds", "command", self.generation_first_frame
+        )
+        lines += self.__histogram_lines(f"{prefix}_generation_duration_seconds", "command", self.generation_duration)
+        lines += self.__counter_lines(f"{prefix}_generation_chars_total", self.generation_chars, ["command"])
+
+        for name, value in self.get_gauges().items():
+            lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {value}"]
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,114 @@
+import time
+import asyncio
+
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    # Allows "rate" requests per second on average with bursts of up to "capacity" requests.
+    # Waiting requests get their tokens strictly in the order they came.
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate: float = rate
+        self.capacity: int = capacity
+
+        self.__tokens: float = float(capacity)
+        self.__updated: float = time.monotonic()
+        self.__lock = asyncio.Lock()
+
+        self.acquired: int = 0
+        self.waited: int = 0
+        self.wait_time_total: float = 0.0
+        self.wait_time_max: float = 0.0
+
+    def __refill(self) -> None:
+        now = time.monotonic()
+
+        self.__tokens = min(float(self.capacity), self.__tokens + (now - self.__updated) * self.rate)
+        self.__updated = now
+
+    async def acquire(self) -> float:
+        start = time.monotonic()
+
+        async with self.__lock:
+            self.__refill()
+
+            if self.__tokens < 1:
+                await asyncio.sleep((1 - self.__tokens) / self.rate)
+                self.__refill()
+
+            self.__tokens -= 1
+
+        wait_time = time.monotonic() - start
+
+        self.acquired += 1
+        if wait_time > 0.001:
+            self.waited += 1
+
+        self.wait_time_total += wait_time
+        self.wait_time_max = max(self.wait_time_max, wait_time)
+
+        return wait_time
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "wait_time_total": self.wait_time_total,
+            "wait_time_max": self.wait_time_max,
+            "wait_time_avg": self.wait_time_total / self.acquired if self.acquired else 0.0,
+        }
+
+
+class RateLimiter:
+    # Token buckets per host (e.g. "neo.character.ai"), created on first use.
+    # Endpoint overrides are url prefixes (e.g. "https://neo.character.ai/turns/"),
+    # a request matching one of them uses its bucket instead of the host one.
+    #
+    # One instance can be passed to several clients to share the limits between them.
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        hosts: Optional[Dict[str, Tuple[float, int]]] = None,
+        endpoints: Optional[Dict[str, Tuple[float, int]]] = None,
+    ):
+        self.rate: float = rate
+        self.burst: int = burst
+
+        self.__hosts: Dict[str, Tuple[float, int]] = hosts or {}
+        self.__endpoints: Dict[str, Tuple[float, int]] = endpoints or {}
+
+        # longest prefix has to be checked first
+        self.__endpoint_prefixes = sorted(self.__endpoints, key=len, reverse=True)
+
+        self.__buckets: Dict[str, TokenBucket] = {}
+
+    def __get_bucket(self, url: str) -> TokenBucket:
+        key: Optional[str] = None
+        rate, burst = self.rate, self.burst
+
+        for prefix in self.__endpoint_prefixes:
+            if url.startswith(prefix):
+                key = prefix
+                rate, burst = self.__endpoints[prefix]
+                break
+
+        if key is None:
+            key = urlparse(url).netloc
+            rate, burst = self.__hosts.get(key, (rate, burst))
+
+        bucket = self.__buckets.get(key, None)
+        if bucket is None:
+            bucket = TokenBucket(rate, burst)
+            self.__buckets[key] = bucket
+
+        return bucket
+
+    async def acquire(self, url: str) -> float:
+        return await self.__get_bucket(url).acquire()
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        return {key: bucket.get_stats() for key, bucket in self.__buckets.items()}
@@ -1,243 +1,1307 @@
 import asyncio
-import json
+import bisect
+import hashlib
+import random
+import inspect
+import time
 
-from typing import Dict, AsyncGenerator, List, Optional, Tuple
+from collections import deque
 
-# for requests
-import curl_cffi
+from urllib.parse import urlparse
+from typing import Any, Awaitable, BinaryIO, Callable, Deque, Dict, AsyncGenerator, List, Optional, Tuple, Union
 
-from .exceptions import RequestError, AuthenticationError, WebsocketClosedError, WebsocketError
+from .codec import JsonCodec, get_codec
+from .retry import DEFAULT_RETRY_POLICY, RetryPolicy
+from .hedging import HedgePolicy
+from .coalescing import CoalescePolicy
+from .ratelimit import RateLimiter
+from .hooks import Event, Hooks
+from .stats import GenerationStats
+from .metrics import MetricsRegistry
+from .transport import Headers, Transport, TransportResponse, TransportWebSocket, CurlTransport, get_header
+from .exceptions import (
+    RequestError,
+    TransportError,
+    AuthenticationError,
+    WebsocketClosedError,
+    WebsocketError,
+    WebsocketConnectionLostError,
+    WebsocketReconnectError,
+    GenerationCancelledError,
+    ConnectTimeoutError,
+)
 
 
 class Requester:
+    # argument meaning "the value set for the client", None or 0 turn a timeout off
+    CLIENT_DEFAULT: Any = object()
+
     def __init__(self, **kwargs):
         self.__extra_options = kwargs
 
-        self.__websocket_headers: Optional[Dict[str, str]] = self.__extra_options.pop("websocket_headers", None)
-        self.__websocket_default_headers: bool = self.__extra_options.pop("websocket_default_headers", True)
+        # policy for HTTP requests (disabled by default), can be replaced for a single call
+        self.__retry_policy: Optional[RetryPolicy] = self.__extra_options.pop("retry_policy", None)
+
+        # optional client-side pacing, can be shared between several clients
+        self.__rate_limiter: Optional[RateLimiter] = self.__extra_options.pop("rate_limiter", None)
+
+        # identical GET requests sent at the same time share one response
+        self.__single_flight: bool = self.__extra_options.pop("single_flight", False)
+        self.__flights: Dict[Tuple, RequestFlight] = {}
+
+        # json library used for bodies, responses and websocket frames
+        self.__codec: JsonCodec = get_codec(self.__extra_options.pop("json_codec", "auto"))
+
+        # second identical request for slow idempotent reads (disabled by default)
+        self.__hedge_policy: Optional[HedgePolicy] = self.__extra_options.pop("hedge_policy", None)
+
+        # deadlines for websocket generations (in seconds), can be overridden for a single call
+        self.__generation_timeouts: Dict[str, Optional[float]] = {
+            "connect_timeout": self.__extra_options.pop("ws_connect_timeout", None),
+            "first_token_timeout": self.__extra_options.pop("first_token_timeout", None),
+            "inter_token_timeout": self.__extra_options.pop("inter_token_timeout", None),
+            "generation_timeout": self.__extra_options.pop("generation_timeout", None),
+        }
+
+        # lifecycle events of requests and websockets (e.g. for tracing)
+        self.__hooks: Hooks = self.__extra_options.pop("hooks", None) or Hooks()
+
+        # optional in-process metrics, collected from the hooks
+        self.__metrics: Optional[MetricsRegistry] = self.__extra_options.pop("metrics", None)
+
+        # called with GenerationStats of every finished generation (send_message, another_response)
+        self.__on_generation_stats: Optional[Callable] = self.__extra_options.pop("on_generation_stats", None)
+
+        # how often streamed answers are yielded (every frame by default)
+        self.__coalesce_policy: Optional[CoalescePolicy] = self.__extra_options.pop("coalesce_policy", None)
+
+        # ask the server to stop generating when a streamed answer is cancelled
+        self.__abort_on_cancel: bool = self.__extra_options.pop("abort_on_cancel", False)
 
-        self.__impersonate: Optional[curl_cffi.BrowserTypeLiteral] = self.__extra_options.pop("impersonate", None)
-        self.__proxy: Optional[str] = self.__extra_options.pop("proxy", None)
+        # how many requests can wait for their frames on one socket at the same time,
+        # and how many undelivered frames each of them can buffer
+        self.__ws_max_in_flight: int = self.__extra_options.pop("ws_max_in_flight", 64)
+        self.__ws_stream_buffer_size: int = self.__extra_options.pop("ws_stream_buffer_size", 32)
 
-        # debug information (TO-DO)
-        # self.__debug: bool = self.__extra_options.pop("requester_debug", False)
-        
-        self.__requester_session: Optional[curl_cffi.AsyncSession] = None
-        self.__ws: Optional[curl_cffi.AsyncWebSocket] = None
+        # keepalive and reconnection of every socket
+        self.__ws_heartbeat_interval: Optional[float] = self.__extra_options.pop("ws_heartbeat_interval", 30.0)
+        self.__ws_heartbeat_timeout: float = self.__extra_options.pop("ws_heartbeat_timeout", 10.0)
+        self.__ws_reconnect_attempts: int = self.__extra_options.pop("ws_reconnect_attempts", 5)
+        self.__ws_reconnect_backoff: float = self.__extra_options.pop("ws_reconnect_backoff", 0.5)
+        self.__ws_reconnect_backoff_max: float = self.__extra_options.pop("ws_reconnect_backoff_max", 30.0)
 
-        self.__ws_response_messages: Dict[str, List] = {}
+        # chats are spread over several sockets by consistent hashing of chat_id
+        self.__ws_pool_size: int = max(1, self.__extra_options.pop("ws_pool_size", 1))
+        self.__ws_url: str = self.__extra_options.pop("ws_url", self.WS_URL)
+
+        # how requests and websockets reach the server, curl_cffi session by default
+        # (options left after everything above are passed to the session)
+        self.__transport: Transport = self.__extra_options.pop("transport", None) or CurlTransport(
+            impersonate=self.__extra_options.pop("impersonate", None),
+            proxy=self.__extra_options.pop("proxy", None),
+            websocket_headers=self.__extra_options.pop("websocket_headers", None),
+            websocket_default_headers=self.__extra_options.pop("websocket_default_headers", True),
+            **self.__extra_options
+        )
+
+        self.__ws_pool: List[WebsocketConnection] = [
+            WebsocketConnection(
+                connect=self.__ws_connect_async,
+                codec=self.__codec,
+                max_in_flight=self.__ws_max_in_flight,
+                stream_buffer_size=self.__ws_stream_buffer_size,
+                heartbeat_interval=self.__ws_heartbeat_interval,
+                heartbeat_timeout=self.__ws_heartbeat_timeout,
+                reconnect_attempts=self.__ws_reconnect_attempts,
+                reconnect_backoff=self.__ws_reconnect_backoff,
+                reconnect_backoff_max=self.__ws_reconnect_backoff_max,
+                hooks=self.__hooks,
+                url=self.__ws_url,
+                index=index,
+            )
+            for index in range(self.__ws_pool_size)
+        ]
+        self.__ws_ring: List[Tuple[int, int]] = self.__build_ws_ring(self.__ws_pool_size)
+
+        if self.__metrics:
+            self.__metrics.attach(self.__hooks)
+            self.__metrics.add_gauge("ws_open_sockets", lambda: sum(ws.is_connected() for ws in self.__ws_pool))
+            self.__metrics.add_gauge("ws_streams_in_flight", lambda: sum(ws.in_flight() for ws in self.__ws_pool))
 
     # ================================================================== #
     #                              Requests                              #
     # ================================================================== #
 
     class Response:
+        # Keeps only the raw body. Text and headers are decoded on first access,
+        # json is parsed at most once (straight from bytes) and then cached.
+
         def __init__(
             self,
             url: str,
             status_code: int,
-            headers: List[Tuple[str, str | None]],
-            text: str,
+            headers: Headers,
             content: bytes,
+            codec: Optional[JsonCodec] = None,
         ):
             self.url: str = url
             self.status_code: int = status_code
-            self.headers: List[Tuple[str, str | None]] = headers
-            self.text: str = text
             self.content: bytes = content
 
+            self.__codec: JsonCodec = codec or JsonCodec()
+
+            self.__raw_headers = headers
+            self.__headers: Optional[List[Tuple[str, str | None]]] = None
+
+            self.__text: Optional[str] = None
+
+            self.__json = None
+            self.__json_parsed: bool = False
+
+        @property
+        def headers(self) -> List[Tuple[str, str | None]]:
+            if self.__headers is None:
+                if isinstance(self.__raw_headers, list):
+                    self.__headers = self.__raw_headers
+                else:
+                    self.__headers = self.__raw_headers.multi_items()
+
+            return self.__headers
+
+        def get_header(self, name: str) -> Optional[str]:
+            return get_header(self.__raw_headers, name)
+
+        def __get_encoding(self) -> str:
+            content_type = self.get_header("content-type") or ""
+
+            for param in content_type.split(";")[1:]:
+                key, _, value = param.strip().partition("=")
+                if key.lower() == "charset" and value:
+                    return value.strip('"')
+
+            return "utf-8"
+
+        @property
+        def text(self) -> str:
+            if self.__text is None:
+                try:
+                    self.__text = self.content.decode(self.__get_encoding(), errors="replace")
+
+                except LookupError:
+                    self.__text = self.content.decode("utf-8", errors="replace")
+
+            return self.__text
+
         def json(self):
-            return json.loads(self.text)
-    
+            if not self.__json_parsed:
+                if self.__get_encoding().lower().replace("-", "") in ["utf8", "ascii"]:
+                    self.__json = self.__codec.loads(self.content)
+                else:
+                    self.__json = self.__codec.loads(self.text)
+
+                self.__json_parsed = True
+
+            return self.__json
+
+    @property
+    def codec(self) -> JsonCodec:
+        return self.__codec
+
+    @property
+    def transport(self) -> Transport:
+        return self.__transport
+
+    @property
+    def hooks(self) -> Hooks:
+        return self.__hooks
+
+    @property
+    def metrics(self) -> Optional[MetricsRegistry]:
+        return self.__metrics
+
+    @property
+    def coalesce_policy(self) -> Optional[CoalescePolicy]:
+        return self.__coalesce_policy
+
+    @property
+    def abort_on_cancel(self) -> bool:
+        return self.__abort_on_cancel
+
     async def open_session(self) -> None: 
-        self.__requester_session = curl_cffi.AsyncSession(
-            impersonate=self.__impersonate or "firefox135",
-            proxy=self.__proxy, 
-            **self.__extra_options
-        )
+        await self.__transport.open()
 
     async def close_session(self) -> None:
-        if self.__requester_session:
-            try:
-                await self.__requester_session.close()
-            
-            finally:
-                self.__requester_session = None
+        await self.__transport.close()
 
     async def ensure_session(self) -> None:
-        if not self.__requester_session:
+        if not self.__transport.is_open():
             await self.open_session()
 
+    # hosts used by the methods, connections to them are opened in advance by warm_up_async()
+    WARM_UP_URLS = [
+        "https://neo.character.ai/",
+        "https://plus.character.ai/",
+        "https://character.ai/",
+    ]
+
+    async def __preconnect_async(self, url: str) -> None:
+        await self.ensure_session()
+        await self.__transport.request("HEAD", url, headers={}, cookies={})
+
+    async def warm_up_async(self, token: str) -> Dict[str, Optional[float]]:
+        # Opens the session, HTTP connections and websockets at the same time.
+        # Returns how long each phase took in seconds (None if it has failed).
+        timings: Dict[str, Optional[float]] = {}
+
+        async def timed(name: str, coroutine: Awaitable) -> None:
+            start = time.perf_counter()
+
+            try:
+                await coroutine
+
+            except (RequestError, AuthenticationError):
+                timings[name] = None
+                return
+
+            timings[name] = time.perf_counter() - start
+
+        await timed("session", self.ensure_session())
+
+        await asyncio.gather(
+            *[timed(f"http:{urlparse(url).netloc}", self.__preconnect_async(url)) for url in self.WARM_UP_URLS],
+            *[timed(f"websocket:{index}", ws.connect(token=token)) for index, ws in enumerate(self.__ws_pool)],
+        )
+
+        return timings
+
+    async def __send_request_async(
+        self, method: str, url: str, headers: Dict, cookies: Dict, body, stream: bool = False
+    ) -> Optional[TransportResponse]:
+        await self.ensure_session()
+
+        if method in ["GET", "DELETE"]:
+            return await self.__transport.request(method, url, headers=headers, cookies=cookies, stream=stream)
+
+        elif method in ["POST", "PUT", "PATCH"]:
+            return await self.__transport.request(
+                method, url, headers=headers, cookies=cookies, body=body, stream=stream
+            )
+
+        return None
+
     async def request_async(self, url: str, options=None) -> Response:
         if options is None:
             options = {}
 
+        # GET requests share flights by default, POST requests only if they are reads (opt-in)
+        if self.__single_flight and options.get("single_flight", options.get("method", "GET") == "GET"):
+            return await self.__request_single_flight_async(url, options)
+
+        return await self.__request_async(url, options)
+
+    def __get_flight_key(self, url: str, options: Dict) -> Tuple:
+        headers = options.get("headers", {})
+        cookies = options.get("cookies", {})
+
+        body = options.get("body", None)
+        if "json" in options:
+            body = self.__codec.dumps(options["json"])
+
+        elif isinstance(body, dict):
+            body = tuple(sorted((str(key), str(value)) for key, value in body.items()))
+
+        # requests made with different credentials must never share a response
+        return (
+            options.get("method", "GET"),
+            url,
+            body,
+            tuple(sorted((str(key).lower(), str(value)) for key, value in headers.items())),
+            tuple(sorted((str(key), str(value)) for key, value in cookies.items())),
+        )
+
+    async def __request_single_flight_async(self, url: str, options: Dict) -> Response:
+        key = self.__get_flight_key(url, options)
+
+        flight = self.__flights.get(key, None)
+        if flight is None:
+            flight = RequestFlight(asyncio.ensure_future(self.__request_async(url, options)))
+            self.__flights[key] = flight
+
+            def forget(_: asyncio.Future) -> None:
+                if self.__flights.get(key, None) is flight:
+                    del self.__flights[key]
+
+            flight.task.add_done_callback(forget)
+
+        flight.waiters += 1
+
+        try:
+            # one cancelled caller must not cancel the request for the others
+            return await asyncio.shield(flight.task)
+
+        finally:
+            flight.waiters -= 1
+
+            if flight.waiters == 0 and not flight.task.done():
+                # new callers must start a new flight instead of joining the cancelled one
+                if self.__flights.get(key, None) is flight:
+                    del self.__flights[key]
+
+                flight.task.cancel()
+
+    def __emit(self, name: str, **kwargs: Any) -> None:
+        if self.__hooks.has(name):
+            self.__hooks.emit(Event(name, **kwargs))
+
+    async def __perform_async(
+        self, url: str, options: Dict, stream: bool = False
+    ) -> Tuple[TransportResponse, float]:
+        # returns the response and the time (monotonic) its attempt has started
         method = options.get("method", "GET")
         headers = options.get("headers", {})
         cookies = options.get("cookies", {})
         body = options.get("body", {})
 
-        raw_response: Optional[curl_cffi.Response] = None
+        if "json" in options:
+            body = self.__codec.dumps(options["json"]) if options["json"] is not None else None
 
-        await self.ensure_session()
-        if not self.__requester_session:
-            raise RequestError
+        retry_policy: Optional[RetryPolicy] = options.get("retry_policy", DEFAULT_RETRY_POLICY)
+        if retry_policy is DEFAULT_RETRY_POLICY:
+            retry_policy = self.__retry_policy
+
+        event = self.__describe(url, options)
+        event["bytes_sent"] = len(body) if isinstance(body, (bytes, str)) else 0
+
+        attempt = 0
+
+        while True:
+            attempt += 1
+
+            if self.__rate_limiter:
+                await self.__rate_limiter.acquire(url)
+
+            started = time.monotonic()
+            self.__emit("request_start", started=started, attempt=attempt, **event)
+
+            try:
+                raw_response = await self.__send_request_async(method, url, headers, cookies, body, stream=stream)
+
+            except asyncio.CancelledError as error:
+                self.__emit("request_error", started=started, attempt=attempt, error=error, **event)
+                raise
+
+            except TransportError as error:
+                if not retry_policy or not retry_policy.should_retry(method, attempt, error=error):
+                    self.__emit("request_error", started=started, attempt=attempt, error=error, **event)
+                    raise
 
-        if method == "GET":
-            raw_response = await self.__requester_session.get(url, headers=headers, cookies=cookies)
+                delay = retry_policy.get_delay(attempt)
+                self.__emit("request_retry", started=started, attempt=attempt, delay=delay, error=error, **event)
+                await retry_policy.notify(
+                    method=method, url=url, attempt=attempt, delay=delay, status_code=None, error=error
+                )
 
-        elif method == "POST":
-            raw_response = await self.__requester_session.post(url, headers=headers, data=body, cookies=cookies)
+                await asyncio.sleep(delay)
+                continue
 
-        elif method == "PUT":
-            raw_response = await self.__requester_session.put(url, headers=headers, data=body, cookies=cookies)
+            if not raw_response:
+                raise RequestError
 
-        elif method == "PATCH":
-            raw_response = await self.__requester_session.patch(url, headers=headers, data=body, cookies=cookies)
+            status_code = raw_response.status_code
+            self.__emit("request_headers", started=started, attempt=attempt, status_code=status_code, **event)
+
+            if retry_policy and retry_policy.should_retry(method, attempt, status_code=status_code):
+                delay = retry_policy.get_delay(attempt, raw_response.get_header("retry-after"))
+                self.__emit(
+                    "request_retry", started=started, attempt=attempt, delay=delay, status_code=status_code, **event
+                )
+                await retry_policy.notify(
+                    method=method, url=url, attempt=attempt, delay=delay,
+                    status_code=raw_response.status_code, error=None
+                )
+
+                if stream:
+                    await raw_response.close()
+
+                await asyncio.sleep(delay)
+                continue
+
+            break
+
+        if raw_response.status_code == 401:
+            if stream:
+                await raw_response.close()
+
+            error = AuthenticationError("Maybe your token is invalid?")
+            self.__emit("request_error", started=started, attempt=attempt, status_code=401, error=error, **event)
+            raise error
+
+        return raw_response, started
+
+    def __describe(self, url: str, options: Dict) -> Dict[str, Any]:
+        # common fields of every event of a request
+        return {
+            "endpoint": self.__get_url_template(url),
+            "operation": options.get("operation", None),
+            "method": options.get("method", "GET"),
+            "url": url,
+        }
+
+    @staticmethod
+    def __get_url_template(url: str) -> str:
+        # ids in the path (e.g. chat_id) are replaced, so one endpoint has one key
+        parsed_url = urlparse(url)
+
+        path = "/".join(
+            "{id}" if any(char.isdigit() for char in segment) else segment
+            for segment in parsed_url.path.split("/")
+        )
 
-        elif method == "DELETE":
-            raw_response = await self.__requester_session.delete(url, headers=headers, cookies=cookies)
+        return f"{parsed_url.netloc}{path}"
 
+    async def __request_async(self, url: str, options: Dict) -> Response:
+        if self.__hedge_policy and options.get("hedge", False):
+            return await self.__request_hedged_async(url, options)
 
-        if not raw_response:
-            raise RequestError
+        return await self.__fetch_async(url, options)
+
+    async def __request_hedged_async(self, url: str, options: Dict) -> Response:
+        # If the first request is slower than usual, an identical one is sent,
+        # the first response wins and the other request is cancelled.
+        policy: HedgePolicy = self.__hedge_policy
+        key = f"{options.get('method', 'GET')} {self.__get_url_template(url)}"
+
+        policy.start_request()
+
+        start = time.perf_counter()
+        first = asyncio.ensure_future(self.__fetch_async(url, options))
+        tasks = [first]
+
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=policy.get_delay(key))
+
+            if not done and policy.try_hedge():
+                tasks.append(asyncio.ensure_future(self.__fetch_async(url, options)))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+
+                    policy.record(key, time.perf_counter() - start)
+                    if task is not first:
+                        policy.hedge_wins += 1
+
+                    return task.result()
+
+            raise error or RequestError
+
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def __fetch_async(self, url: str, options: Dict) -> Response:
+        raw_response, started = await self.__perform_async(url, options)
 
         response = self.Response(
             url=url,
             status_code=raw_response.status_code,
-            headers=raw_response.headers.multi_items(),
-            text=raw_response.text,
+            headers=raw_response.headers,
             content=raw_response.content,
+            codec=self.__codec,
         )
 
-        if response.status_code == 401:
-            raise AuthenticationError("Maybe your token is invalid?")
+        if self.__hooks.has("request_body"):
+            self.__emit(
+                "request_body",
+                started=started,
+                status_code=response.status_code,
+                bytes_received=len(response.content),
+                **self.__describe(url, options)
+            )
 
         return response
 
+    async def stream_async(self, url: str, options=None) -> "StreamResponse":
+        # Same as request_async(), but the body is not downloaded until it is iterated
+        if options is None:
+            options = {}
+
+        raw_response, started = await self.__perform_async(url, options, stream=True)
+
+        def on_close(size: int) -> None:
+            self.__emit(
+                "request_body",
+                started=started,
+                status_code=raw_response.status_code,
+                bytes_received=size,
+                **self.__describe(url, options)
+            )
+
+        return StreamResponse(
+            url=url,
+            status_code=raw_response.status_code,
+            headers=raw_response.headers,
+            raw_response=raw_response,
+            on_close=on_close,
+        )
+
     # ================================================================== #
     #                             Websockets                             #
     #              (everything bellow is subject to change)              #
     # ================================================================== #
 
+    WS_URL = "wss://neo.character.ai/ws/"
+
+    WS_RING_REPLICAS = 64
+
+    @staticmethod
+    def __hash_key(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    @classmethod
+    def __build_ws_ring(cls, pool_size: int) -> List[Tuple[int, int]]:
+        return sorted(
+            (cls.__hash_key(f"ws-{index}-{replica}"), index)
+            for index in range(pool_size)
+            for replica in range(cls.WS_RING_REPLICAS)
+        )
+
+    @staticmethod
+    def __get_chat_id(message: Dict) -> Optional[str]:
+        payload = message.get("payload", {})
+
+        for turn_key in (
+            payload.get("turn_key", None),
+            payload.get("turn", {}).get("turn_key", None),
+            payload.get("chat", None),
+        ):
+            if turn_key and turn_key.get("chat_id", None):
+                return str(turn_key["chat_id"])
+
+        return payload.get("chat_id", None)
+
+    def ws_connection_for(self, chat_id: Optional[str]) -> "WebsocketConnection":
+        if chat_id is None or len(self.__ws_pool) == 1:
+            return self.__ws_pool[0]
+
+        index = bisect.bisect(self.__ws_ring, (self.__hash_key(chat_id), -1)) % len(self.__ws_ring)
+        return self.__ws_pool[self.__ws_ring[index][1]]
+
+    def ws_connections(self) -> List["WebsocketConnection"]:
+        return list(self.__ws_pool)
+
     async def ws_close_async(self) -> None:
-        if self.__ws:
-            try:
-                await self.__ws.close()
-            
-            except curl_cffi.CurlError:
-                raise WebsocketClosedError
+        results = await asyncio.gather(*[ws.close() for ws in self.__ws_pool], return_exceptions=True)
 
-            finally:
-                self.__ws = None
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
 
-    async def __ws_connect_async(self, token: str) -> None:
+    async def __ws_connect_async(self, token: str) -> TransportWebSocket:
         await self.ensure_session()
-        if not self.__requester_session:
-            raise RequestError
 
-        if self.__ws:
-            await self.ws_close_async()
-        
         try:
-            self.__ws = await self.__requester_session.ws_connect(
-                impersonate="firefox135" or self.__impersonate,
-                url="wss://neo.character.ai/ws/",
-                headers=self.__websocket_headers,
-                default_headers=self.__websocket_default_headers,
-                cookies={"HTTP_AUTHORIZATION": f"Token {token}"}
-            )
+            ws = await self.__transport.ws_connect(self.__ws_url, cookies={"HTTP_AUTHORIZATION": f"Token {token}"})
 
-        except curl_cffi.CurlError:
+        except TransportError:
             raise AuthenticationError("maybe your token is invalid?")
 
-        if not self.__ws:
+        if not ws:
             raise AuthenticationError("maybe your token is invalid?")
 
-    async def __ws_ensure_connection(self, token: str) -> None:
-        if not self.__ws:
-            await self.__ws_connect_async(token=token)
-        
-    def __ws_clear_response_messages(self, request_uuid: Optional[str] = None) -> None:
-        if request_uuid:
-            self.__ws_response_messages.pop(request_uuid, None)
-        else:
-            self.__ws_response_messages = {}
-
-    async def __ws_send_async(self, message: Dict, token: str) -> None:
-        await self.__ws_ensure_connection(token=token)
-        
+        return ws
+
+    def ws_streams(self) -> List["WebsocketStream"]:
+        return [stream for ws in self.__ws_pool for stream in ws.streams()]
+
+    def wants_generation_stats(self, **kwargs: Any) -> bool:
+        return bool(
+            kwargs.get("generation_stats", False) or kwargs.get("on_generation_stats", None)
+            or self.__on_generation_stats or self.__metrics
+        )
+
+    async def publish_generation_stats(self, stats: GenerationStats, callback: Optional[Callable] = None) -> None:
+        if self.__metrics:
+            self.__metrics.record_generation(stats)
+
+        callback = callback or self.__on_generation_stats
+        if callback is None:
+            return
+
+        result = callback(stats)
+        if inspect.isawaitable(result):
+            await result
+
+    def get_generation_timeouts(self, **kwargs: Any) -> Dict[str, Optional[float]]:
+        # client defaults, overridden by the ones passed to a method (None or 0 turn one off)
+        return {key: kwargs[key] if key in kwargs else value for key, value in self.__generation_timeouts.items()}
+
+    async def ws_send_and_receive_async(
+        self,
+        message: Dict,
+        token: str,
+        connect_timeout: Optional[float] = CLIENT_DEFAULT,
+        stats: Optional[GenerationStats] = None,
+    ) -> AsyncGenerator:
+        ws = self.ws_connection_for(self.__get_chat_id(message))
+
+        if connect_timeout is self.CLIENT_DEFAULT:
+            connect_timeout = self.__generation_timeouts["connect_timeout"]
+
+        if connect_timeout and not ws.is_connected():
+            try:
+                await asyncio.wait_for(ws.ensure_connection(token=token), timeout=connect_timeout)
+
+            except asyncio.TimeoutError:
+                raise ConnectTimeoutError(f"Cannot connect to websocket in {connect_timeout} seconds.")
+
+        # a lost connection is recovered by WebsocketConnection (idempotent commands only)
+        request = ws.send_and_receive_async(message=message, token=token, stats=stats)
+
+        try:
+            async for response in request:
+                yield response
+
+        finally:
+            # unregisters the request as soon as the consumer stops reading
+            await request.aclose()
+
+    def ws_cancel(self, request_uuid: str) -> bool:
+        return any([ws.cancel(request_uuid) for ws in self.__ws_pool])
+
+
+class StreamResponse:
+    # Response whose body is received in chunks, so memory usage does not depend on its size.
+    # The body can be iterated only once, the connection is released after that (or after close()).
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: Headers,
+        raw_response: TransportResponse,
+        on_close: Optional[Callable[[int], None]] = None,
+    ):
+        self.url: str = url
+        self.status_code: int = status_code
+        self.headers: Headers = headers
+
+        self.__raw_response = raw_response
+        self.__on_close = on_close
+        self.__closed: bool = False
+
+        self.bytes_received: int = 0
+
+    async def iter_content(self, chunk_size: Optional[int] = None) -> AsyncGenerator[bytes, None]:
+        try:
+            async for chunk in self.__raw_response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    self.bytes_received += len(chunk)
+                    yield chunk
+
+        finally:
+            await self.close()
+
+    async def read(self) -> bytes:
+        content = bytearray()
+
+        async for chunk in self.iter_content():
+            content += chunk
+
+        return bytes(content)
+
+    async def save(self, sink: Union[str, BinaryIO]) -> int:
+        # writes the body to a file path or to a writable binary object, returns its size
+        size = 0
+
+        if isinstance(sink, str):
+            with open(sink, "wb") as file:
+                return await self.save(file)
+
+        async for chunk in self.iter_content():
+            sink.write(chunk)
+            size += len(chunk)
+
+        return size
+
+    async def close(self) -> None:
+        if not self.__closed:
+            self.__closed = True
+            await self.__raw_response.close()
+
+            if self.__on_close:
+                self.__on_close(self.bytes_received)
+
+
+class GenerationStream:
+    # Streamed answer of send_message / another_response, iterated with "async for".
+    #
+    # cancel() stops the generation at once: the request is unregistered from its socket
+    # (later frames are dropped), a consumer waiting for the next part stops iterating.
+    # Closing the stream before its end, including garbage collection after a "break", cancels it too.
+
+    def __init__(self, generator: AsyncGenerator, request_id: str, on_cancel: Callable[[], Any]):
+        self.request_id: str = request_id
+
+        self.__generator: AsyncGenerator = generator
+        self.__on_cancel: Callable[[], Any] = on_cancel
+
+        self.finished: bool = False
+        self.cancelled: bool = False
+
+    def __aiter__(self) -> "GenerationStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await self.__generator.__anext__()
+
+        except StopAsyncIteration:
+            self.finished = True
+            raise
+
+        except GenerationCancelledError:
+            self.finished = True
+
+            if self.cancelled:
+                raise StopAsyncIteration
+            raise
+
+        except BaseException:
+            self.finished = True
+            raise
+
+    def cancel(self) -> None:
+        if self.finished or self.cancelled:
+            return
+
+        self.cancelled = True
+        self.__on_cancel()
+
+        # a running generator is woken up by the cancellation itself
+        if not self.__generator.ag_running:
+            try:
+                task = asyncio.ensure_future(self.__generator.aclose())
+                task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+            except RuntimeError:
+                # no running event loop
+                pass
+
+    async def aclose(self) -> None:
+        if not (self.finished or self.cancelled):
+            self.cancelled = True
+            self.__on_cancel()
+
+        self.finished = True
+        await self.__generator.aclose()
+
+    def __del__(self) -> None:
+        self.cancel()
+
+
+class RequestFlight:
+    # a request shared by every caller waiting for the same response
+
+    def __init__(self, task: asyncio.Future):
+        self.task: asyncio.Future = task
+        self.waiters: int = 0
+
+
+class WebsocketStream:
+    # Bounded buffer of frames routed to one request.
+    #
+    # The reader never waits for a slow consumer, because that would stall every other
+    # request on the socket. Instead, when the buffer is full, a new "update_turn" frame
+    # replaces the buffered one for the same candidate (each of them carries the whole
+    # text generated so far), so only this stream skips intermediate frames.
+    # Frames that cannot be superseded are always kept, unless drop_oldest is set.
+
+    def __init__(
+        self,
+        request_id: Optional[str],
+        max_size: int = 32,
+        drop_oldest: bool = False,
+        message: Optional[Dict] = None,
+    ):
+        self.request_id: Optional[str] = request_id
+        self.message: Optional[Dict] = message
+        self.max_size: int = max_size
+        self.drop_oldest: bool = drop_oldest
+
+        self.__frames: Deque[Union[Dict, WebsocketError, None]] = deque()
+        self.__event = asyncio.Event()
+
+        self.started: float = time.monotonic()
+
+        self.high_watermark: int = 0
+        self.superseded: int = 0
+        self.dropped: int = 0
+        self.received: int = 0
+        self.bytes_received: int = 0
+
+    def size(self) -> int:
+        return len(self.__frames)
+
+    def usage(self) -> float:
+        return len(self.__frames) / self.max_size if self.max_size > 0 else 0.0
+
+    @staticmethod
+    def __get_candidate_key(frame: Dict) -> Optional[Tuple]:
+        if frame.get("command", None) != "update_turn":
+            return None
+
+        turn = frame.get("turn", {})
+        candidates = turn.get("candidates", [])
+
+        if any(candidate.get("is_final", False) for candidate in candidates):
+            return None
+
+        return (
+            turn.get("turn_key", {}).get("turn_id", None),
+            tuple(candidate.get("candidate_id", None) for candidate in candidates),
+        )
+
+    def __supersede(self, frame: Dict) -> bool:
+        key = self.__get_candidate_key(frame)
+        if key is None:
+            return False
+
+        for index in range(len(self.__frames) - 1, -1, -1):
+            buffered = self.__frames[index]
+            if isinstance(buffered, dict) and self.__get_candidate_key(buffered) == key:
+                self.__frames[index] = frame
+                self.superseded += 1
+                return True
+
+        return False
+
+    def put(self, frame: Union[Dict, WebsocketError, None], size: int = 0) -> None:
+        if not isinstance(frame, dict):
+            # end of the stream (None) or an error
+            self.__frames.append(frame)
+            self.__event.set()
+            return
+
+        self.received += 1
+        self.bytes_received += size
+
+        if len(self.__frames) < self.max_size or not self.__supersede(frame):
+            if self.drop_oldest and len(self.__frames) >= self.max_size:
+                self.__frames.popleft()
+                self.dropped += 1
+
+            self.__frames.append(frame)
+            self.high_watermark = max(self.high_watermark, len(self.__frames))
+
+        self.__event.set()
+
+    def clear(self) -> int:
+        size = len(self.__frames)
+        self.__frames.clear()
+
+        return size
+
+    async def get(self) -> Union[Dict, WebsocketError, None]:
+        while not self.__frames:
+            self.__event.clear()
+            await self.__event.wait()
+
+        return self.__frames.popleft()
+
+
+class WebsocketConnection:
+    # One socket with one background reader. Every frame is decoded once by the reader
+    # and routed by its "request_id" into the stream of the request waiting for it.
+    # Frames without request_id (or nobody was waiting for) go to the fallback stream,
+    # late frames of finished or cancelled requests are dropped.
+    #
+    # While connected, a heartbeat pings the socket to keep it warm and to notice
+    # half-open connections: a ping is only queued for sending, so the connection is
+    # considered lost when requests are waiting and nothing at all has been received
+    # for heartbeat_interval + heartbeat_timeout. When the socket is lost, it is reconnected
+    # in background with exponential backoff, and in-flight idempotent commands are sent again.
+
+    FALLBACK_BUFFER_SIZE = 128
+
+    # how many request ids of finished requests are remembered to drop their late frames
+    FINISHED_REQUESTS_SIZE = 1024
+
+    # commands that can be safely sent twice
+    IDEMPOTENT_COMMANDS = ["edit_turn_candidate", "set_turn_pin", "update_primary_candidate"]
+
+    def __init__(
+        self,
+        connect: Callable[[str], Awaitable[TransportWebSocket]],
+        codec: Optional[JsonCodec] = None,
+        max_in_flight: int = 64,
+        stream_buffer_size: int = 32,
+        heartbeat_interval: Optional[float] = 30.0,
+        heartbeat_timeout: float = 10.0,
+        reconnect_attempts: int = 5,
+        reconnect_backoff: float = 0.5,
+        reconnect_backoff_max: float = 30.0,
+        hooks: Optional[Hooks] = None,
+        url: str = "",
+        index: int = 0,
+    ):
+        self.__connect = connect
+        self.__codec: JsonCodec = codec or JsonCodec()
+
+        self.__hooks: Hooks = hooks or Hooks()
+        self.__url: str = url
+        self.__index: int = index
+
+        self.__stream_buffer_size = stream_buffer_size
+        self.__in_flight = asyncio.Semaphore(max_in_flight)
+
+        self.__heartbeat_interval = heartbeat_interval
+        self.__heartbeat_timeout = heartbeat_timeout
+
+        self.__reconnect_attempts = reconnect_attempts
+        self.__reconnect_backoff = reconnect_backoff
+        self.__reconnect_backoff_max = reconnect_backoff_max
+
+        self.__ws: Optional[TransportWebSocket] = None
+        self.__token: Optional[str] = None
+        self.__connected_at: float = 0.0
+        self.__last_frame_at: float = 0.0
+
+        self.__reader: Optional[asyncio.Task] = None
+        self.__heartbeat: Optional[asyncio.Task] = None
+        self.__reconnecting: Optional[asyncio.Task] = None
+
+        self.__connect_lock = asyncio.Lock()
+
+        self.__streams: Dict[str, WebsocketStream] = {}
+        self.__fallback_stream = WebsocketStream(None, max_size=self.FALLBACK_BUFFER_SIZE, drop_oldest=True)
+        self.__fallback_waiters: int = 0
+        self.__finished: Dict[str, None] = {}
+
+        self.reconnects: int = 0
+        self.dropped_frames: int = 0
+
+    def is_connected(self) -> bool:
+        return self.__ws is not None
+
+    def in_flight(self) -> int:
+        return len(self.__streams)
+
+    def streams(self) -> List[WebsocketStream]:
+        return list(self.__streams.values())
+
+    def __finish(self, request_uuid: str) -> Optional[WebsocketStream]:
+        self.__finished[request_uuid] = None
+
+        if len(self.__finished) > self.FINISHED_REQUESTS_SIZE:
+            del self.__finished[next(iter(self.__finished))]
+
+        return self.__streams.pop(request_uuid, None)
+
+    def __is_idempotent(self, stream: WebsocketStream) -> bool:
+        return stream.message is not None and stream.message.get("command", None) in self.IDEMPOTENT_COMMANDS
+
+    def cancel(self, request_uuid: str) -> bool:
+        # the request stops waiting at once, its later frames are dropped
+        stream = self.__finish(request_uuid)
+        if stream is None:
+            return False
+
+        stream.put(GenerationCancelledError("Generation was cancelled."))
+        return True
+
+    async def connect(self, token: str) -> None:
+        async with self.__connect_lock:
+            self.__token = token
+
+            if self.__ws:
+                return
+
+            started = time.monotonic()
+            ws = await self.__connect(token)
+
+            self.__ws = ws
+            self.__connected_at = started
+            self.__last_frame_at = time.monotonic()
+            self.__emit("ws_connect", started=started)
+            self.__reader = asyncio.create_task(self.__read_loop(ws))
+
+            if self.__heartbeat_interval:
+                self.__heartbeat = asyncio.create_task(self.__heartbeat_loop(ws))
+
+    async def ensure_connection(self, token: str) -> None:
         if not self.__ws:
-            raise WebsocketError
-        
+            await self.connect(token=token)
+
+    def __emit(self, name: str, **kwargs: Any) -> None:
+        if self.__hooks.has(name):
+            kwargs.setdefault("endpoint", self.__url)
+            self.__hooks.emit(Event(name, method="WS", connection=self.__index, **kwargs))
+
+    def __cancel_tasks(self, *tasks: Optional[asyncio.Task]) -> None:
+        for task in tasks:
+            if task and task is not asyncio.current_task():
+                task.cancel()
+
+    async def close(self) -> None:
+        ws = self.__ws
+        self.__ws = None
+
+        self.__cancel_tasks(self.__reader, self.__heartbeat, self.__reconnecting)
+        self.__reader, self.__heartbeat, self.__reconnecting = None, None, None
+
         try:
-            await self.__ws.send_json(message)
+            if ws:
+                self.__emit("ws_close", started=self.__connected_at)
+                await ws.close()
 
-        except curl_cffi.CurlError:
-            await self.ws_close_async()
-            raise WebsocketError
+        except TransportError:
+            raise WebsocketClosedError
+
+        finally:
+            # None signals to every waiting request that the session is closed
+            for stream in self.__streams.values():
+                stream.put(None)
+
+            for _ in range(self.__fallback_waiters):
+                self.__fallback_stream.put(None)
+
+    async def __connection_lost(self, ws: TransportWebSocket) -> None:
+        if self.__ws is not ws:
+            return
+
+        self.__ws = None
 
+        self.__cancel_tasks(self.__reader, self.__heartbeat)
+        self.__reader, self.__heartbeat = None, None
+
+        self.__emit("ws_close", started=self.__connected_at, error=WebsocketConnectionLostError("Connection was lost."))
 
-    async def __ws_receive_async(self, request_uuid: Optional[str]) -> AsyncGenerator:
         try:
-            while True:
-                if request_uuid is not None:
-                    saved_messages = self.__ws_response_messages.get(request_uuid, [])
+            await ws.close()
 
-                    if len(saved_messages) > 0:
-                        message = saved_messages.pop(0)
-                        self.__ws_response_messages[request_uuid] = saved_messages
+        except TransportError:
+            pass
 
-                        yield message
-                        continue
+        # Requests that cannot be repeated are failed and unregistered right away
+        # (so they are never sent again), idempotent ones wait for the connection to be restored.
+        waiting = False
+
+        for request_uuid, stream in list(self.__streams.items()):
+            if self.__is_idempotent(stream):
+                waiting = True
+                continue
+
+            self.__finish(request_uuid)
+            stream.put(WebsocketConnectionLostError("Websocket connection was lost while waiting for response."))
+
+        # requests without request_id cannot be matched to their answer, so they are never sent again
+        for _ in range(self.__fallback_waiters):
+            self.__fallback_stream.put(
+                WebsocketConnectionLostError("Websocket connection was lost while waiting for response.")
+            )
+
+        if (waiting or self.__heartbeat_interval) and self.__token and not self.__reconnecting:
+            self.__reconnecting = asyncio.create_task(self.__reconnect_loop(self.__token))
+
+    async def __reconnect_loop(self, token: str) -> None:
+        try:
+            for attempt in range(self.__reconnect_attempts):
+                delay = min(self.__reconnect_backoff * (2 ** attempt), self.__reconnect_backoff_max)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
 
-                # else
                 try:
-                    if not self.__ws:
-                        raise WebsocketError
+                    await self.ensure_connection(token=token)
 
-                    try: 
-                        response = await self.__ws.recv_str()
+                except (RequestError, AuthenticationError):
+                    continue
 
-                    except curl_cffi.CurlError:
-                        await self.ws_close_async()
-                        raise WebsocketError
-                        
-                    response_json = json.loads(response)
+                self.reconnects += 1
 
-                except asyncio.CancelledError:
-                    yield None  # signaling that session is closed
-                    break
+                for stream in list(self.__streams.values()):
+                    if not self.__is_idempotent(stream):
+                        continue
+
+                    try:
+                        await self.__send_async(stream.message, token=token)
+
+                    except WebsocketError as error:
+                        stream.put(error)
+
+                return
+
+            for stream in list(self.__streams.values()):
+                stream.put(WebsocketReconnectError(
+                    f"Cannot restore websocket connection after {self.__reconnect_attempts} attempts."
+                ))
 
-                command = response_json.get("command", None)
+        finally:
+            if self.__reconnecting is asyncio.current_task():
+                self.__reconnecting = None
+
+    async def __heartbeat_loop(self, ws: TransportWebSocket) -> None:
+        while self.__ws is ws:
+            await asyncio.sleep(self.__heartbeat_interval or 0)
+
+            # pongs are consumed by the transport, so any frame received counts as a sign of life.
+            # An idle socket receives nothing, silence only matters while somebody is waiting.
+            if not self.__streams and not self.__fallback_waiters:
+                self.__last_frame_at = time.monotonic()
+
+            try:
+                if not ws.is_alive():
+                    raise WebsocketError
 
-                if command in [None, "ok"] or request_uuid is None:
-                    yield response_json
+                silence = time.monotonic() - self.__last_frame_at
+                if silence > (self.__heartbeat_interval or 0) + self.__heartbeat_timeout:
+                    raise WebsocketError
+
+                await asyncio.wait_for(ws.ping(), timeout=self.__heartbeat_timeout)
+
+            except (asyncio.TimeoutError, TransportError, WebsocketError):
+                await self.__connection_lost(ws)
+                return
+
+    def __route(self, message: Dict, size: int) -> None:
+        request_uuid = message.get("request_id", None)
+
+        stream = self.__streams.get(request_uuid, None)
+        if stream is None:
+            if request_uuid in self.__finished:
+                self.dropped_frames += 1
+                return
+
+            stream = self.__fallback_stream
+
+        stream.put(message, size)
+
+        if self.__hooks.has("ws_frame"):
+            # frames are attributed to the command of the request they answer
+            self.__emit(
+                "ws_frame",
+                endpoint=(stream.message or message).get("command", None) or "",
+                started=stream.started if stream.message else None,
+                bytes_received=size,
+                command=message.get("command", None),
+                request_id=message.get("request_id", None),
+            )
+
+    async def __read_loop(self, ws: TransportWebSocket) -> None:
+        try:
+            while True:
+                try:
+                    response = await ws.recv()
+
+                except TransportError:
                     break
 
-                messages = self.__ws_response_messages.get(request_uuid, [])
-                messages.append(response_json)
+                self.__last_frame_at = time.monotonic()
+
+                try:
+                    message = self.__codec.loads(response)
+
+                except ValueError:
+                    continue
 
-                self.__ws_response_messages[request_uuid] = messages
+                if isinstance(message, dict):
+                    self.__route(message, len(response))
 
         finally:
-            if request_uuid:
-                self.__ws_clear_response_messages(request_uuid)
+            await self.__connection_lost(ws)
+
+    async def __send_async(self, message: Dict, token: str) -> None:
+        await self.ensure_connection(token=token)
+
+        ws = self.__ws
+        if not ws:
+            raise WebsocketError
+
+        data = self.__codec.dumps(message)
 
-    async def ws_send_and_receive_async(self, message: Dict, token: str) -> AsyncGenerator:
+        try:
+            await ws.send(data)
+
+        except TransportError:
+            await self.__connection_lost(ws)
+            raise WebsocketConnectionLostError("Websocket connection was lost while sending a message.")
+
+        self.__emit(
+            "ws_send",
+            endpoint=message.get("command", None) or "",
+            bytes_sent=len(data),
+            command=message.get("command", None),
+            request_id=message.get("request_id", None),
+        )
+
+    async def send_and_receive_async(
+        self, message: Dict, token: str, stats: Optional[GenerationStats] = None
+    ) -> AsyncGenerator:
         request_uuid = message.get("request_id", None)
-        retries = 0
-        
-        while True:
+
+        async with self.__in_flight:
+            started = time.monotonic()
+            error: Optional[BaseException] = None
+
+            if request_uuid is None:
+                stream = self.__fallback_stream
+
+                # nobody is waiting for the frames buffered so far, they must not be taken as our answer
+                if not self.__fallback_waiters:
+                    self.dropped_frames += stream.clear()
+
+                self.__fallback_waiters += 1
+
+            else:
+                # registering before sending, so no frame can arrive before we are listening
+                stream = WebsocketStream(request_uuid, max_size=self.__stream_buffer_size, message=message)
+                self.__streams[request_uuid] = stream
+
             try:
-                await self.__ws_send_async(message=message, token=token)
-                async for message in self.__ws_receive_async(request_uuid=request_uuid):
-                    yield message
-            
-            except WebsocketClosedError:
-                if retries < 3:
-                    retries += 1
-                else: 
-                    raise RequestError
+                await self.__send_async(message=message, token=token)
+
+                while True:
+                    response = await stream.get()
+
+                    if isinstance(response, WebsocketError):
+                        raise response
+
+                    if stats is not None:
+                        stats.frames_received = stream.received
+                        stats.bytes_received = stream.bytes_received
+
+                    yield response
+
+                    if response is None:
+                        break
+
+                    if request_uuid is None or response.get("command", None) in [None, "ok"]:
+                        break
+
+            except (Exception, asyncio.CancelledError) as exception:
+                error = exception
+                raise
+
+            finally:
+                if request_uuid is None:
+                    self.__fallback_waiters -= 1
 
+                else:
+                    self.__finish(request_uuid)
 
+                # the consumer can also stop reading earlier (e.g. after the final frame)
+                self.__emit(
+                    "ws_stream_end",
+                    endpoint=message.get("command", None) or "",
+                    started=started,
+                    error=error,
+                    command=message.get("command", None),
+                    request_id=request_uuid,
+                )
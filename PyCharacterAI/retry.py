@@ -0,0 +1,108 @@
+import random
+import inspect
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, List, Optional
+
+
+# "retry_policy" option meaning "the policy of the client", None turns retries off
+DEFAULT_RETRY_POLICY: Any = object()
+
+
+class RetryPolicy:
+    # Decides whether a failed HTTP request is sent again and how long to wait before it.
+    #
+    # Idempotent methods are retried on any of retry_statuses and on transport errors (timeouts,
+    # reset connections). Other methods are retried only on non_idempotent_statuses, for which
+    # the server tells us explicitly that the request was not processed.
+
+    IDEMPOTENT_METHODS = ["GET", "HEAD", "OPTIONS", "PUT", "DELETE"]
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff: float = 0.5,
+        backoff_max: float = 10.0,
+        jitter: float = 0.5,
+        retry_statuses: Optional[List[int]] = None,
+        non_idempotent_statuses: Optional[List[int]] = None,
+        respect_retry_after: bool = True,
+        retry_after_max: float = 60.0,
+        on_retry: Optional[Callable[..., Any]] = None,
+    ):
+        self.max_attempts: int = max_attempts
+
+        self.backoff: float = backoff
+        self.backoff_max: float = backoff_max
+        self.jitter: float = jitter
+
+        # an empty list turns retries on statuses off
+        self.retry_statuses: List[int] = retry_statuses if retry_statuses is not None else [429, 500, 502, 503, 504]
+        self.non_idempotent_statuses: List[int] = (
+            non_idempotent_statuses if non_idempotent_statuses is not None else [429, 503]
+        )
+
+        self.respect_retry_after: bool = respect_retry_after
+        self.retry_after_max: float = retry_after_max
+
+        # called (or awaited) before every retry with the keyword arguments:
+        # method, url, attempt, delay, status_code, error
+        self.on_retry: Optional[Callable[..., Any]] = on_retry
+
+    def is_idempotent(self, method: str) -> bool:
+        return method.upper() in self.IDEMPOTENT_METHODS
+
+    def should_retry(
+        self, method: str, attempt: int, status_code: Optional[int] = None, error: Optional[BaseException] = None
+    ) -> bool:
+        if attempt >= self.max_attempts:
+            return False
+
+        if error is not None:
+            # we cannot know if a non-idempotent request has reached the server
+            return self.is_idempotent(method)
+
+        if self.is_idempotent(method):
+            return status_code in self.retry_statuses
+
+        return status_code in self.non_idempotent_statuses
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+
+        except ValueError:
+            pass
+
+        try:
+            date = parsedate_to_datetime(value)
+
+        except (TypeError, ValueError):
+            return None
+
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+
+        return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+    def get_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if self.respect_retry_after:
+            delay = self.parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.retry_after_max)
+
+        delay = min(self.backoff * (2 ** (attempt - 1)), self.backoff_max)
+        return delay * (1 - self.jitter * random.random())
+
+    async def notify(self, **kwargs: Any) -> None:
+        if self.on_retry is None:
+            return
+
+        result = self.on_retry(**kwargs)
+        if inspect.isawaitable(result):
+            await result
@@ -0,0 +1,102 @@
+import time
+
+from typing import Any, Dict, Optional, Set
+
+
+class GenerationStats:
+    # How fast one answer was generated (send_message, another_response).
+    # Times are in seconds from the moment the request was sent, frames are the ones
+    # delivered to the caller (intermediate frames can be skipped for a slow consumer),
+    # frames_received and bytes_received count everything received for the request.
+
+    def __init__(
+        self,
+        command: str,
+        character_id: str,
+        chat_id: str,
+        turn_id: Optional[str] = None,
+        num_candidates: int = 1,
+    ):
+        self.command: str = command
+        self.character_id: str = character_id
+        self.chat_id: str = chat_id
+        self.turn_id: Optional[str] = turn_id
+
+        self.started: float = time.monotonic()
+        self.first_frame_at: Optional[float] = None
+        self.final_at: Optional[float] = None
+
+        self.frames: int = 0
+        self.frames_received: int = 0
+        self.bytes_received: int = 0
+
+        self.chars: int = 0
+        self.first_frame_chars: int = 0
+
+        # with several candidates, chars are counted for all of them
+        self.num_candidates: int = num_candidates
+        self.__lengths: Dict[str, int] = {}
+        self.__finals: Set[str] = set()
+
+    def record_frame(self, frame: Dict) -> None:
+        now = time.monotonic()
+
+        turn = frame.get("turn", {})
+
+        self.frames += 1
+        self.turn_id = turn.get("turn_key", {}).get("turn_id", self.turn_id)
+
+        # a frame can update one candidate or all of them at once
+        for candidate in turn.get("candidates", None) or []:
+            candidate_id = candidate.get("candidate_id", "")
+            self.__lengths[candidate_id] = len(candidate.get("raw_content", "") or "")
+
+            if candidate.get("is_final", False):
+                self.__finals.add(candidate_id)
+
+        self.chars = sum(self.__lengths.values())
+
+        if self.first_frame_at is None:
+            self.first_frame_at = now
+            self.first_frame_chars = self.chars
+
+        if self.final_at is None and len(self.__finals) >= self.num_candidates:
+            self.final_at = now
+
+    @property
+    def is_final(self) -> bool:
+        return self.final_at is not None
+
+    @property
+    def time_to_first_frame(self) -> Optional[float]:
+        return self.first_frame_at - self.started if self.first_frame_at is not None else None
+
+    @property
+    def time_to_final(self) -> Optional[float]:
+        return self.final_at - self.started if self.final_at is not None else None
+
+    @property
+    def chars_per_second(self) -> Optional[float]:
+        # streaming speed, after the first frame
+        if self.final_at is None or self.first_frame_at is None or self.final_at <= self.first_frame_at:
+            return None
+
+        return (self.chars - self.first_frame_chars) / (self.final_at - self.first_frame_at)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "command": self.command,
+            "character_id": self.character_id,
+            "chat_id": self.chat_id,
+            "turn_id": self.turn_id,
+            "time_to_first_frame": self.time_to_first_frame,
+            "time_to_final": self.time_to_final,
+            "frames": self.frames,
+            "frames_received": self.frames_received,
+            "bytes_received": self.bytes_received,
+            "chars": self.chars,
+            "chars_per_second": self.chars_per_second,
+        }
+
+    def __repr__(self) -> str:
+        return f"<GenerationStats {self.command} frames={self.frames} ttff={self.time_to_first_frame}>"
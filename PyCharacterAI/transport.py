@@ -0,0 +1,215 @@
+from typing import AsyncGenerator, Dict, List, Optional, Tuple, Union
+
+import curl_cffi
+from curl_cffi import CurlWsFlag
+
+from .exceptions import TransportError
+
+
+Headers = Union[curl_cffi.Headers, List[Tuple[str, Optional[str]]]]
+
+
+def get_header(headers: Headers, name: str) -> Optional[str]:
+    if not isinstance(headers, list):
+        return headers.get(name, None)
+
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+
+    return None
+
+
+class TransportResponse:
+    # HTTP response as seen by the requester. For streamed responses
+    # the body is read only through iter_content().
+
+    def __init__(self, status_code: int, headers: Headers):
+        self.status_code: int = status_code
+        self.headers: Headers = headers
+
+    @property
+    def content(self) -> bytes:
+        raise NotImplementedError
+
+    def get_header(self, name: str) -> Optional[str]:
+        return get_header(self.headers, name)
+
+    async def iter_content(self, chunk_size: Optional[int] = None) -> AsyncGenerator[bytes, None]:
+        yield self.content
+
+    async def close(self) -> None:
+        pass
+
+
+class TransportWebSocket:
+    # Text frames only, every method raises TransportError once the socket is broken
+
+    async def send(self, data: bytes) -> None:
+        raise NotImplementedError
+
+    async def recv(self) -> bytes:
+        raise NotImplementedError
+
+    async def ping(self) -> None:
+        raise NotImplementedError
+
+    def is_alive(self) -> bool:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        raise NotImplementedError
+
+
+class Transport:
+    # Everything the requester needs from the network. The default one uses curl_cffi,
+    # another one can be passed to the client (e.g. Client(transport=FakeTransport())).
+
+    def is_open(self) -> bool:
+        raise NotImplementedError
+
+    async def open(self) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        raise NotImplementedError
+
+    async def request(
+        self, method: str, url: str, headers: Dict, cookies: Dict, body=None, stream: bool = False
+    ) -> TransportResponse:
+        raise NotImplementedError
+
+    async def ws_connect(self, url: str, cookies: Dict) -> TransportWebSocket:
+        raise NotImplementedError
+
+
+class CurlResponse(TransportResponse):
+    def __init__(self, raw_response: curl_cffi.Response):
+        super().__init__(raw_response.status_code, raw_response.headers)
+
+        self.__raw_response = raw_response
+
+    @property
+    def content(self) -> bytes:
+        return self.__raw_response.content
+
+    async def iter_content(self, chunk_size: Optional[int] = None) -> AsyncGenerator[bytes, None]:
+        try:
+            async for chunk in self.__raw_response.aiter_content(chunk_size=chunk_size):
+                yield chunk
+
+        except curl_cffi.CurlError as error:
+            raise TransportError(str(error)) from error
+
+    async def close(self) -> None:
+        await self.__raw_response.aclose()
+
+
+class CurlWebSocket(TransportWebSocket):
+    def __init__(self, ws: curl_cffi.AsyncWebSocket):
+        self.__ws = ws
+
+    async def send(self, data: bytes) -> None:
+        try:
+            await self.__ws.send(data, CurlWsFlag.TEXT)
+
+        except curl_cffi.CurlError as error:
+            raise TransportError(str(error)) from error
+
+    async def recv(self) -> bytes:
+        try:
+            data, _ = await self.__ws.recv()
+
+        except curl_cffi.CurlError as error:
+            raise TransportError(str(error)) from error
+
+        return data
+
+    async def ping(self) -> None:
+        try:
+            await self.__ws.ping(b"")
+
+        except curl_cffi.CurlError as error:
+            raise TransportError(str(error)) from error
+
+    def is_alive(self) -> bool:
+        return self.__ws.is_alive()
+
+    async def close(self) -> None:
+        try:
+            await self.__ws.close()
+
+        except curl_cffi.CurlError as error:
+            raise TransportError(str(error)) from error
+
+
+class CurlTransport(Transport):
+    def __init__(
+        self,
+        impersonate: Optional[curl_cffi.BrowserTypeLiteral] = None,
+        proxy: Optional[str] = None,
+        websocket_headers: Optional[Dict[str, str]] = None,
+        websocket_default_headers: bool = True,
+        **session_options
+    ):
+        self.__impersonate: Optional[curl_cffi.BrowserTypeLiteral] = impersonate
+        self.__proxy: Optional[str] = proxy
+
+        self.__websocket_headers: Optional[Dict[str, str]] = websocket_headers
+        self.__websocket_default_headers: bool = websocket_default_headers
+
+        self.__session_options = session_options
+        self.__session: Optional[curl_cffi.AsyncSession] = None
+
+    def is_open(self) -> bool:
+        return self.__session is not None
+
+    async def open(self) -> None:
+        self.__session = curl_cffi.AsyncSession(
+            impersonate=self.__impersonate or "firefox135",
+            proxy=self.__proxy,
+            **self.__session_options
+        )
+
+    async def close(self) -> None:
+        if self.__session:
+            try:
+                await self.__session.close()
+
+            finally:
+                self.__session = None
+
+    async def request(
+        self, method: str, url: str, headers: Dict, cookies: Dict, body=None, stream: bool = False
+    ) -> TransportResponse:
+        if not self.__session:
+            await self.open()
+
+        try:
+            raw_response = await self.__session.request(
+                method, url, headers=headers, cookies=cookies, data=body, stream=stream
+            )
+
+        except curl_cffi.CurlError as error:
+            raise TransportError(str(error)) from error
+
+        return CurlResponse(raw_response)
+
+    async def ws_connect(self, url: str, cookies: Dict) -> TransportWebSocket:
+        if not self.__session:
+            await self.open()
+
+        try:
+            ws = await self.__session.ws_connect(
+                impersonate=self.__impersonate or "firefox135",
+                url=url,
+                headers=self.__websocket_headers,
+                default_headers=self.__websocket_default_headers,
+                cookies=cookies
+            )
+
+        except curl_cffi.CurlError as error:
+            raise TransportError(str(error)) from error
+
+        return CurlWebSocket(ws)
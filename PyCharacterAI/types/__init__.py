@@ -1,6 +1,6 @@
 from .character import Character, CharacterShort
 from .chat import Chat, ChatHistory
-from .message import Turn, TurnCandidate
+from .message import Turn, TurnCandidate, TurnDelta, TurnUpdate
 from .user import Account, Persona, PublicUser
 from .media import Avatar, Voice
 
@@ -11,6 +11,8 @@ __all__ = [
     "ChatHistory",
     "Turn",
     "TurnCandidate",
+    "TurnDelta",
+    "TurnUpdate",
     "Account",
     "Persona",
     "PublicUser",
@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import List, Optional, Dict
 
 from .base import BaseCAI
+from ..stats import GenerationStats
 
 
 # Chat v1
@@ -83,6 +84,25 @@ class Turn(BaseCAI):
 
         self.primary_candidate_id: Optional[str] = options.get("primary_candidate_id")
 
+        # set on the final turn of send_message / another_response (generation_stats=True),
+        # kept out of get_dict(), which contains only the data of the turn
+        self.__generation_stats: Optional[GenerationStats] = None
+
+    @property
+    def generation_stats(self) -> Optional[GenerationStats]:
+        return self.__generation_stats
+
+    @generation_stats.setter
+    def generation_stats(self, stats: Optional[GenerationStats]) -> None:
+        self.__generation_stats = stats
+
+    def get_dict(self, raw: bool = False):
+        fields = super().get_dict(raw)
+
+        if not raw:
+            fields.pop("_Turn__generation_stats", None)
+        return fields
+
     def get_candidates(self) -> List[TurnCandidate]:
         return list(self.candidates.values())
 
@@ -90,3 +110,58 @@ class Turn(BaseCAI):
         if self.primary_candidate_id:
             return self.candidates.get(self.primary_candidate_id)
         return None
+
+
+class TurnUpdate:
+    # Part of a streamed answer (stream_mode="update") with only what is needed to show it.
+    # Parsing a whole Turn for every frame is much slower, to_turn() does it on demand.
+
+    __slots__ = ("chat_id", "turn_id", "candidate_id", "text", "is_final", "is_filtered", "__raw", "__turn")
+
+    def __init__(self, options: Dict, turn: Optional[Turn] = None):
+        turn_key = options["turn_key"]
+        candidate = options["candidates"][0]
+
+        self.chat_id: str = turn_key["chat_id"]
+        self.turn_id: str = turn_key["turn_id"]
+
+        self.candidate_id: str = candidate["candidate_id"]
+        self.text: str = candidate.get("raw_content", "")
+        self.is_final: bool = candidate.get("is_final", False)
+        self.is_filtered: bool = candidate.get("safety_truncated", False)
+
+        self.__raw: Dict = options
+        self.__turn: Optional[Turn] = turn
+
+    def to_turn(self) -> Turn:
+        if self.__turn is None:
+            self.__turn = Turn(self.__raw)
+
+        return self.__turn
+
+
+class TurnDelta:
+    # Part of a streamed answer (stream_mode="delta"). The candidate text so far is
+    # previous_text[:offset] + text, offset is usually the length of the previous text
+    # and is smaller only when the server rewrites the answer. Only the final delta
+    # carries the whole turn.
+
+    __slots__ = ("chat_id", "turn_id", "candidate_id", "text", "offset", "is_final", "turn")
+
+    def __init__(
+        self,
+        chat_id: str,
+        turn_id: str,
+        candidate_id: str,
+        text: str,
+        offset: int,
+        is_final: bool,
+        turn: Optional[Turn] = None,
+    ):
+        self.chat_id: str = chat_id
+        self.turn_id: str = turn_id
+        self.candidate_id: str = candidate_id
+        self.text: str = text
+        self.offset: int = offset
+        self.is_final: bool = is_final
+        self.turn: Optional[Turn] = turn
@@ -0,0 +1,256 @@
+# Measures end-to-end client throughput and latency against the in-process fake backend,
+# so only the client overhead is measured (no network, replies are generated instantly
+# unless --token-rate is set). Results are printed as json to compare releases.
+#
+# Usage: python benchmarks/bench_client.py [--only streaming,concurrency] [--output results.json]
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyCharacterAI import Client  # noqa: E402
+from PyCharacterAI.codec import get_codec  # noqa: E402
+from PyCharacterAI.fake import FakeBackend, FakeTransport  # noqa: E402
+from PyCharacterAI.types import Chat, Turn, TurnUpdate  # noqa: E402
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percentile * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    # seconds to milliseconds
+    return {
+        "p50_ms": _percentile(values, 0.50) * 1e3,
+        "p95_ms": _percentile(values, 0.95) * 1e3,
+        "max_ms": max(values) * 1e3,
+        "mean_ms": statistics.mean(values) * 1e3,
+    }
+
+
+def _make_reply(words: int):
+    def reply(character: Dict, text: str) -> str:
+        return " ".join(f"word{index}" for index in range(words))
+
+    return reply
+
+
+async def _make_client(args, **backend_options):
+    backend = FakeBackend(
+        token_rate=args.token_rate,
+        tokens_per_frame=args.tokens_per_frame,
+        reply=_make_reply(args.words),
+        **backend_options,
+    )
+    character_id = backend.add_character(name="Benchmark")
+
+    client = Client(transport=FakeTransport(backend), ws_heartbeat_interval=None)
+    await client.authenticate("benchmark")
+
+    return client, backend, character_id
+
+
+async def bench_streaming(args) -> Dict:
+    client, _, character_id = await _make_client(args)
+    chat, _ = await client.chat.create_chat(character_id, greeting=False)
+
+    ttft, durations = [], []
+    frames = 0
+
+    for _ in range(args.messages):
+        start = time.perf_counter()
+        first = None
+
+        async for _ in await client.chat.send_message(character_id, chat.chat_id, "Hello!", streaming=True):
+            frames += 1
+            if first is None:
+                first = time.perf_counter() - start
+
+        ttft.append(first or 0.0)
+        durations.append(time.perf_counter() - start)
+
+    await client.close_session()
+
+    return {
+        "messages": args.messages,
+        "frames": frames,
+        "frames_per_second": frames / sum(durations),
+        "messages_per_second": args.messages / sum(durations),
+        "ttft": _summary(ttft),
+        "message": _summary(durations),
+    }
+
+
+async def bench_concurrency(args) -> Dict:
+    client, _, character_id = await _make_client(args)
+    chats = [(await client.chat.create_chat(character_id, greeting=False))[0] for _ in range(args.concurrency)]
+
+    latencies: List[float] = []
+
+    async def conversation(chat: Chat) -> None:
+        for _ in range(args.conversation_messages):
+            start = time.perf_counter()
+            await client.chat.send_message(character_id, chat.chat_id, "Hello!")
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[conversation(chat) for chat in chats])
+    elapsed = time.perf_counter() - start
+
+    await client.close_session()
+
+    return {
+        "conversations": args.concurrency,
+        "messages": len(latencies),
+        "messages_per_second": len(latencies) / elapsed,
+        "message": _summary(latencies),
+    }
+
+
+async def bench_fetch_all_messages(args) -> Dict:
+    client, backend, character_id = await _make_client(args)
+    chat, _ = await client.chat.create_chat(character_id, greeting=False)
+    backend.add_turns(chat.chat_id, args.turns)
+
+    pages = -(-args.turns // backend.page_size)
+    durations = []
+
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        await client.chat.fetch_all_messages(chat.chat_id)
+        durations.append(time.perf_counter() - start)
+
+    await client.close_session()
+
+    return {
+        "turns": args.turns,
+        "pages": pages,
+        "pages_per_second": pages * args.repeat / sum(durations),
+        "turns_per_second": args.turns * args.repeat / sum(durations),
+        "fetch_all": _summary(durations),
+    }
+
+
+async def bench_create_chat(args) -> Dict:
+    client, _, character_id = await _make_client(args)
+
+    durations = []
+
+    for _ in range(args.messages):
+        start = time.perf_counter()
+        await client.chat.create_chat(character_id)
+        durations.append(time.perf_counter() - start)
+
+    await client.close_session()
+
+    return {"chats": args.messages, "create_chat": _summary(durations)}
+
+
+async def bench_parsing(args) -> Dict:
+    backend = FakeBackend(reply=_make_reply(args.words))
+    character_id = backend.add_character(name="Benchmark")
+
+    frames = []
+
+    async def collect(frame: Dict) -> None:
+        frames.append(frame)
+
+    await backend.handle_ws(
+        {"command": "create_chat", "payload": {"chat": {"chat_id": "chat", "character_id": character_id}}},
+        collect,
+    )
+    raw_chat = frames[0]["chat"]
+
+    frames.clear()
+    await backend.handle_ws(
+        {
+            "command": "create_and_generate_turn",
+            "payload": {
+                "turn": {"turn_key": {"chat_id": "chat", "turn_id": "turn"}, "candidates": [{"raw_content": "Hi"}]}
+            },
+        },
+        collect,
+    )
+    raw_turns = [frame["turn"] for frame in frames if frame["command"] == "update_turn"]
+
+    count = args.parse_count
+
+    start = time.perf_counter()
+    for index in range(count):
+        Turn(raw_turns[index % len(raw_turns)])
+    turn_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for index in range(count):
+        TurnUpdate(raw_turns[index % len(raw_turns)])
+    update_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(count):
+        Chat(raw_chat)
+    chat_time = time.perf_counter() - start
+
+    return {
+        "objects": count,
+        "turn_us": turn_time / count * 1e6,
+        "turn_update_us": update_time / count * 1e6,
+        "chat_us": chat_time / count * 1e6,
+    }
+
+
+BENCHMARKS = {
+    "streaming": bench_streaming,
+    "concurrency": bench_concurrency,
+    "fetch_all_messages": bench_fetch_all_messages,
+    "create_chat": bench_create_chat,
+    "parsing": bench_parsing,
+}
+
+
+async def run(args) -> Dict:
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+
+    results = {}
+    for name in names:
+        results[name] = await BENCHMARKS[name](args)
+
+    return {
+        "benchmark": "client",
+        "python": platform.python_version(),
+        "json_codec": get_codec().name,
+        "options": vars(args),
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", type=str, default="", help=f"comma separated: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--words", type=int, default=60, help="words in every reply")
+    parser.add_argument("--tokens-per-frame", type=int, default=1)
+    parser.add_argument("--token-rate", type=float, default=None, help="words per second, unlimited by default")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--conversation-messages", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--parse-count", type=int, default=20000)
+    parser.add_argument("--output", type=str, default="", help="also write the results to this file")
+    args = parser.parse_args()
+
+    output = json.dumps(asyncio.run(run(args)), indent=2)
+    print(output)
+
+    if args.output:
+        Path(args.output).write_text(output)
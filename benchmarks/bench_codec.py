@@ -0,0 +1,115 @@
+# Measures how long it takes to decode one streamed "update_turn" frame
+# (one token update) and to encode one outgoing message with every available json codec.
+#
+# Usage: python benchmarks/bench_codec.py [--frames 400] [--repeat 5]
+
+import sys
+import json
+import time
+import argparse
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PyCharacterAI.codec import CODECS  # noqa: E402
+
+
+def _measure(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def make_frames(count: int):
+    frames = []
+    text = ""
+
+    for index in range(count):
+        text += f"token{index} "
+        frames.append(
+            json.dumps(
+                {
+                    "command": "update_turn",
+                    "request_id": "c3a7b1f0-0000-0000-0000-000000000000",
+                    "turn": {
+                        "turn_key": {"chat_id": "chat", "turn_id": "turn"},
+                        "create_time": "2024-01-01T00:00:00.000000Z",
+                        "last_update_time": "2024-01-01T00:00:00.000000Z",
+                        "state": "STATE_OK",
+                        "author": {"author_id": "1", "name": "Character"},
+                        "candidates": [
+                            {
+                                "candidate_id": "candidate",
+                                "create_time": "2024-01-01T00:00:00.000000Z",
+                                "raw_content": text,
+                                "is_final": index == count - 1,
+                            }
+                        ],
+                        "primary_candidate_id": "candidate",
+                    },
+                }
+            ).encode("utf-8")
+        )
+
+    return frames
+
+
+def make_message():
+    return {
+        "command": "create_and_generate_turn",
+        "origin_id": "web-next",
+        "request_id": "c3a7b1f0-0000-0000-0000-000000000000",
+        "payload": {
+            "character_id": "character",
+            "num_candidates": 1,
+            "turn": {
+                "author": {"author_id": "1", "is_human": True, "name": ""},
+                "candidates": [{"candidate_id": "candidate", "raw_content": "Hello! " * 20}],
+                "primary_candidate_id": "candidate",
+                "turn_key": {"chat_id": "chat", "turn_id": "turn"},
+            },
+        },
+    }
+
+
+def run(frames_count: int, repeat: int):
+    frames = make_frames(frames_count)
+    message = make_message()
+
+    results = {}
+
+    for name, codec_class in CODECS.items():
+        try:
+            codec = codec_class()
+
+        except ImportError:
+            continue
+
+        decode = min(_measure(lambda: [codec.loads(frame) for frame in frames]) for _ in range(repeat))
+        encode = min(_measure(lambda: [codec.dumps(message) for _ in range(frames_count)]) for _ in range(repeat))
+
+        results[name] = {
+            "decode_per_frame_us": decode / frames_count * 1e6,
+            "encode_per_message_us": encode / frames_count * 1e6,
+        }
+
+    baseline = results["json"]["decode_per_frame_us"]
+    for result in results.values():
+        result["decode_speedup"] = baseline / result["decode_per_frame_us"]
+
+    return {
+        "benchmark": "codec",
+        "frames": frames_count,
+        "frame_bytes_avg": sum(len(frame) for frame in frames) / frames_count,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.frames, args.repeat), indent=2))
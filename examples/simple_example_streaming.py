@@ -22,17 +22,14 @@ async def main():
             # NOTE: input() is blocking function!
             message = input(f"[{me.name}]: ")
 
-            answer = await client.chat.send_message(character_id, chat.chat_id, message, streaming=True)
-
-            printed_length = 0
-            async for message in answer:
-                if printed_length == 0:
-                    print(f"[{message.author_name}]: ", end="")
-
-                text = message.get_primary_candidate().text
-                print(text[printed_length:], end="")
-
-                printed_length = len(text)
+            # stream_mode="delta" yields only the new part of the answer
+            answer = await client.chat.send_message(
+                character_id, chat.chat_id, message, streaming=True, stream_mode="delta"
+            )
+
+            print(f"[{greeting_message.author_name}]: ", end="")
+            async for delta in answer:
+                print(delta.text, end="")
             print("\n")
 
     except SessionClosedError: